@@ -3,9 +3,6 @@ import requests
 import json
 import os
 from datetime import datetime
-import tempfile
-from moviepy import VideoFileClip
-from pydub import AudioSegment
 import io
 import base64
 from docx import Document
@@ -73,71 +70,6 @@ def get_available_models():
 # Get available LLM models
 available_models = get_available_models()
 
-def extract_audio_from_video(video_file):
-    """Extract audio from video file"""
-    try:
-        # Create a temporary file to save the video
-        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as temp_video:
-            temp_video.write(video_file.read())
-            temp_video_path = temp_video.name
-
-        # Extract audio using moviepy
-        video = VideoFileClip(temp_video_path)
-        
-        # Create a temporary file for the audio
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
-            video.audio.write_audiofile(temp_audio.name)
-            audio_segment = AudioSegment.from_wav(temp_audio.name)
-            
-        # Cleanup temporary files
-        os.unlink(temp_video_path)
-        os.unlink(temp_audio.name)
-        video.close()
-        
-        return audio_segment
-    except Exception as e:
-        st.error(f"Ошибка при извлечении аудио из видео: {str(e)}")
-        return None
-
-def load_audio_file(audio_file):
-    """Load audio file into AudioSegment"""
-    try:
-        # Read the uploaded file into memory
-        audio_bytes = audio_file.read()
-        
-        # Create a temporary file with the correct extension
-        ext = audio_file.name.split('.')[-1].lower()
-        with tempfile.NamedTemporaryFile(suffix=f'.{ext}', delete=False) as temp_audio:
-            temp_audio.write(audio_bytes)
-            audio_segment = AudioSegment.from_file(temp_audio.name, format=ext)
-            os.unlink(temp_audio.name)
-        return audio_segment
-    except Exception as e:
-        st.error(f"Ошибка при загрузке аудио файла: {str(e)}")
-        return None
-
-def combine_audio_segments(audio_segments):
-    """Combine multiple audio segments into one"""
-    try:
-        combined = AudioSegment.empty()
-        for segment in audio_segments:
-            combined += segment
-        return combined
-    except Exception as e:
-        st.error(f"Ошибка при объединении аудио файлов: {str(e)}")
-        return None
-
-def audio_segment_to_file(audio_segment):
-    """Convert AudioSegment to file-like object"""
-    try:
-        buffer = io.BytesIO()
-        audio_segment.export(buffer, format="wav")
-        buffer.seek(0)
-        return buffer
-    except Exception as e:
-        st.error(f"Ошибка при конвертации аудио: {str(e)}")
-        return None 
-
 def check_services():
     """Check if all required services are available"""
     services_status = {}
@@ -169,61 +101,166 @@ def check_services():
     return services_status
 
 def transcribe_audio(audio_file):
-    """Transcribe audio file using the transcription service"""
+    """Transcribe audio file using the transcription service job queue"""
     try:
         files = {"file": (audio_file.name, audio_file, audio_file.type)}
         data = {
-            "model_type": "rnnt",  # используем RNNT модель по умолчанию
+            "model_type": "auto",  # RNNT, а при высокой нагрузке более быстрая CTC
             "long_form": "true"    # включаем поддержку длинных аудио
         }
         
         st.info(f"Отправка аудиофайла: {audio_file.name} ({audio_file.type})")
         
+        # Ставим задачу в очередь: сервис сразу возвращает идентификатор задачи
         response = requests.post(
-            f"{AUDIO_TRANSCRIPTION_SERVICE_URL}/transcribe",
+            f"{AUDIO_TRANSCRIPTION_SERVICE_URL}/transcribe/jobs",
             files=files,
             data=data,
-            timeout=600  # увеличиваем timeout до 10 минут для длинных аудио
+            timeout=120
         )
+        if response.status_code not in (200, 202):
+            st.error(f"Ошибка при постановке в очередь: {response.text}")
+            return None
+        job_id = response.json()["job_id"]
         
-        if response.status_code == 200:
-            result = response.json()
-            # Проверяем формат ответа
-            if "utterances" in result:
-                # Для длинной транскрипции объединяем все сегменты
-                return "\n".join([u["transcription"] for u in result["utterances"]])
-            elif "transcription" in result:
-                # Для обычной транскрипции
-                return result["transcription"]
-            else:
-                st.error("Неожиданный формат ответа от сервиса транскрибации")
-                return None
+        # Читаем прогресс задачи из ndjson-потока
+        status_placeholder = st.empty()
+        partial_placeholder = st.empty()
+        partial_text = []
+        result = None
+        with requests.get(
+            f"{AUDIO_TRANSCRIPTION_SERVICE_URL}/transcribe/jobs/{job_id}/stream",
+            stream=True,
+            timeout=(10, None)
+        ) as stream:
+            for line in stream.iter_lines():
+                if not line:
+                    continue
+                update = json.loads(line)
+                status = update.get("status")
+                if status == "queued":
+                    status_placeholder.info("Аудио в очереди на транскрибацию...")
+                elif status == "processing":
+                    status_placeholder.info("Идет транскрибация аудио...")
+                elif status == "utterance":
+                    # Показываем текст по мере распознавания фраз
+                    partial_text.append(update["transcription"])
+                    partial_placeholder.text("\n".join(partial_text))
+                elif status == "failed":
+                    status_placeholder.empty()
+                    st.error(f"Ошибка при транскрибации: {update.get('message')}")
+                    return None
+                elif status == "completed":
+                    status_placeholder.empty()
+                    partial_placeholder.empty()
+                    result = update["result"]
+                    break
+        
+        if result is None:
+            st.error("Соединение с сервисом транскрибации прервано")
+            return None
+        if result.get("model_type"):
+            st.caption(f"Модель распознавания: {result['model_type']}")
+        # Сервис хранит транскрипцию, дальше ее можно передавать по идентификатору
+        st.session_state.transcript_id = result.get("id")
+        # Проверяем формат ответа
+        if "utterances" in result:
+            # Для длинной транскрипции объединяем все сегменты
+            return "\n".join([u["transcription"] for u in result["utterances"]])
+        elif "transcription" in result:
+            # Для обычной транскрипции
+            return result["transcription"]
         else:
-            st.error(f"Ошибка при транскрибации: {response.text}")
+            st.error("Неожиданный формат ответа от сервиса транскрибации")
             return None
     except requests.exceptions.Timeout:
-        st.error("Превышено время ожидания ответа от сервера. Аудиофайл может быть слишком длинным.")
+        st.error("Превышено время ожидания ответа от сервера транскрибации.")
         return None
     except Exception as e:
         st.error(f"Ошибка при транскрибации: {str(e)}")
         return None
 
-def process_transcript(text, selected_model):
+def transcribe_audio_batch(audio_files):
+    """Transcribe several files in parallel with the batch endpoint of the transcription service"""
+    try:
+        files = [("files", (f.name, f, f.type)) for f in audio_files]
+        data = {
+            "model_type": "auto",
+            "long_form": "true"
+        }
+        
+        st.info(f"Отправка {len(audio_files)} файлов на транскрибацию")
+        
+        status_placeholder = st.empty()
+        results = {}
+        with requests.post(
+            f"{AUDIO_TRANSCRIPTION_SERVICE_URL}/transcribe/batch",
+            files=files,
+            data=data,
+            stream=True,
+            timeout=(120, None)
+        ) as response:
+            if response.status_code in (429, 503):
+                # Сервис перегружен и сразу отказал вместо долгого ожидания
+                retry_after = response.headers.get("Retry-After", "несколько")
+                st.warning(f"Сервис транскрибации перегружен, повторите попытку через {retry_after} с")
+                return None
+            if response.status_code != 200:
+                st.error(f"Ошибка при транскрибации: {response.text}")
+                return None
+            # Файлы приходят по мере готовности, index - позиция файла в запросе
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                update = json.loads(line)
+                status = update.get("status")
+                if status == "file":
+                    result = update["result"]
+                    if "utterances" in result:
+                        results[update["index"]] = "\n".join([u["transcription"] for u in result["utterances"]])
+                    else:
+                        results[update["index"]] = result.get("transcription", "")
+                elif status == "file_error":
+                    st.warning(f"Файл {update.get('filename')} не распознан: {update.get('message')}")
+                elif status == "completed":
+                    break
+                status_placeholder.info(f"Распознано файлов: {len(results)} из {len(audio_files)}")
+        
+        status_placeholder.empty()
+        if not results:
+            st.error("Не удалось распознать ни один файл")
+            return None
+        # Сохраняем порядок, в котором файлы были загружены
+        return "\n".join(results[index] for index in sorted(results))
+    except requests.exceptions.Timeout:
+        st.error("Превышено время ожидания ответа от сервера транскрибации.")
+        return None
+    except Exception as e:
+        st.error(f"Ошибка при транскрибации: {str(e)}")
+        return None
+
+def process_transcript(text, selected_model, transcript_id=None):
     """Process transcript into medical documentation"""
     try:
         # Создаем статус-контейнер для отображения прогресса
         status_container = st.empty()
         
+        request_body = {
+            "model_type": selected_model,
+            "parameters": {
+                "temperature": 0.3,
+                "max_tokens": 8000
+            }
+        }
+        # Сохраненная транскрипция передается по идентификатору, а не целым текстом
+        if transcript_id:
+            request_body["transcript_id"] = transcript_id
+        else:
+            request_body["transcript"] = text
+        
         response = requests.post(
             f"{MEDICAL_DOC_SERVICE_URL}/process_transcript",
-            json={
-                "transcript": text,
-                "model_type": selected_model,
-                "parameters": {
-                    "temperature": 0.3,
-                    "max_tokens": 8000
-                }
-            },
+            json=request_body,
             stream=True,
             timeout=600  # 10 минут таймаут
         )
@@ -519,6 +556,8 @@ def create_docx(medical_doc, recommendations=None):
 # Initialize session state
 if "transcription" not in st.session_state:
     st.session_state.transcription = None
+if "transcript_id" not in st.session_state:
+    st.session_state.transcript_id = None
 if "medical_doc" not in st.session_state:
     st.session_state.medical_doc = None
 if "recommendations" not in st.session_state:
@@ -554,16 +593,22 @@ st.markdown("""
 
 # File upload section
 st.header("1. Загрузка файлов")
-uploaded_file = st.file_uploader(
+uploaded_files = st.file_uploader(
     "Загрузите аудио или видео файлы",
-    type=['mp3', 'wav', 'm4a', 'mp4', 'avi', 'mov'],
+    type=['mp3', 'wav', 'm4a', 'ogg', 'flac', 'mp4', 'avi', 'mov', 'mkv', 'webm'],
+    accept_multiple_files=True,
 )
 
 # Process files and generate documentation
-if uploaded_file:
+if uploaded_files:
     if st.button("🎯 Начать обработку"):
         with st.spinner("Транскрибация аудио..."):
-            transcription = transcribe_audio(uploaded_file)
+            st.session_state.transcript_id = None
+            if len(uploaded_files) == 1:
+                transcription = transcribe_audio(uploaded_files[0])
+            else:
+                # Несколько файлов распознаются параллельно, без склейки в один WAV
+                transcription = transcribe_audio_batch(uploaded_files)
             if transcription:
                 st.session_state.transcription = transcription
                 st.rerun()
@@ -596,7 +641,11 @@ if st.session_state.transcription:
         doc_gen_placeholder = st.empty()
         with doc_gen_placeholder.container():
             with st.spinner("⏳ Генерация медицинской документации..."):
-                medical_doc = process_transcript(st.session_state.transcription, st.session_state.doc_model_select)
+                medical_doc = process_transcript(
+                    st.session_state.transcription,
+                    st.session_state.doc_model_select,
+                    st.session_state.transcript_id
+                )
                 if medical_doc:
                     st.session_state.medical_doc = medical_doc
                     st.session_state.doc_edited = False
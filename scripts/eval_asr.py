@@ -1,22 +1,99 @@
+"""
+Evaluate the transcription service on data/asr_data.
+
+Run the service with TRANSCRIPTION_CACHE_ENABLED=false: a result served from
+the cache takes no inference time, so runs with cache hits report no RTF.
+"""
 import argparse
 import csv
+import io
 import requests
 import jiwer
 from tqdm import tqdm
 import os
 import soundfile as sf
+import numpy as np
 import json
+import time
 from datetime import datetime
 
-def evaluate_model(model_name, audio_dir, meta_file):
+SERVICE_URL = "http://localhost:8004"
+
+def transcribe_batch(model_name, audio_dir, filenames, batch_size):
+    """Send files to /transcribe/batch in groups and return ({filename: transcription}, cache hits)"""
+    transcriptions = {}
+    cached = 0
+    for start in tqdm(range(0, len(filenames), batch_size), desc=f"{model_name} batches"):
+        group = filenames[start:start + batch_size]
+        handles = [open(os.path.join(audio_dir, name), 'rb') for name in group]
+        try:
+            files = [('files', (name, handle, 'audio/wav')) for name, handle in zip(group, handles)]
+            with requests.post(
+                f"{SERVICE_URL}/transcribe/batch",
+                files=files,
+                data={'model_type': model_name, 'long_form': 'false'},
+                stream=True,
+                timeout=(60, None)
+            ) as r:
+                r.raise_for_status()
+                # Results arrive in completion order; index refers to the position in the request
+                for line in r.iter_lines():
+                    if not line:
+                        continue
+                    update = json.loads(line)
+                    if update['status'] == 'file':
+                        transcriptions[group[update['index']]] = update['result']['transcription']
+                        cached += bool(update['result'].get('cached'))
+                    elif update['status'] == 'file_error':
+                        print(f"Error processing {group[update['index']]}: {update['message']}")
+        except Exception as e:
+            print(f"Error processing batch starting at {group[0]}: {str(e)}")
+        finally:
+            for handle in handles:
+                handle.close()
+    return transcriptions, cached
+
+def get_model_memory(model_name):
+    """Memory footprint of a loaded model as reported by the service, in MB"""
+    try:
+        details = requests.get(f"{SERVICE_URL}/models", timeout=10).json().get("details", {})
+        return details.get(model_name, {}).get("memory_mb")
+    except Exception:
+        return None
+
+def warm_up(model_name):
+    """Transcribe one second of fresh noise (never a cache hit) so model loading is not counted in the RTF"""
+    buffer = io.BytesIO()
+    sf.write(buffer, np.random.default_rng().normal(0, 0.01, 16000).astype('float32'), 16000, format='WAV')
+    buffer.seek(0)
+    try:
+        requests.post(
+            f"{SERVICE_URL}/transcribe",
+            files={'file': ('warmup.wav', buffer, 'audio/wav')},
+            data={'model_type': model_name, 'long_form': 'false'},
+            timeout=600
+        )
+    except Exception as e:
+        print(f"Warm-up request failed: {str(e)}")
+
+def evaluate_model(model_name, audio_dir, meta_file, batch_size=0):
     truth, hypothesis = [], []
+    audio_seconds = 0.0
     
     # Read metadata
     with open(meta_file, 'r', encoding='utf8') as f:
-        reader = csv.DictReader(f, delimiter='\t')
-        for row in reader:
+        rows = list(csv.DictReader(f, delimiter='\t'))
+    
+    warm_up(model_name)
+    
+    started = time.perf_counter()
+    if batch_size:
+        transcriptions, cached = transcribe_batch(model_name, audio_dir, [row['filename'] for row in rows], batch_size)
+    else:
+        transcriptions = {}
+        cached = 0
+        for row in rows:
             wav_file = row['filename']
-            ref_text = row['text']
             
             # Read audio file
             audio_path = os.path.join(audio_dir, wav_file)
@@ -30,20 +107,33 @@ def evaluate_model(model_name, audio_dir, meta_file):
                         'long_form': 'false'
                     }
                     r = requests.post(
-                        "http://localhost:8004/transcribe",
+                        f"{SERVICE_URL}/transcribe",
                         files=files,
                         data=data,
                         timeout=600
                     )
                 r.raise_for_status()
-                hyp_text = r.json()['transcription']
-                
-                truth.append(ref_text.lower())
-                hypothesis.append(hyp_text.lower())
+                result = r.json()
+                transcriptions[wav_file] = result['transcription']
+                cached += bool(result.get('cached'))
                 
             except Exception as e:
                 print(f"Error processing {wav_file}: {str(e)}")
                 continue
+    elapsed = time.perf_counter() - started
+    if cached:
+        print(
+            f"Warning: {cached} results of {model_name} were served from the cache, RTF is not reported; "
+            "run the service with TRANSCRIPTION_CACHE_ENABLED=false"
+        )
+    
+    references = {}
+    for row in rows:
+        if row['filename'] in transcriptions:
+            references[row['filename']] = row['text'].lower()
+            truth.append(row['text'].lower())
+            hypothesis.append(transcriptions[row['filename']].lower())
+            audio_seconds += sf.info(os.path.join(audio_dir, row['filename'])).duration
     
     # Calculate metrics
     wer = jiwer.wer(truth, hypothesis)
@@ -53,13 +143,77 @@ def evaluate_model(model_name, audio_dir, meta_file):
         "model": model_name,
         "wer": wer,
         "cer": cer,
-        "samples": len(truth)
+        "samples": len(truth),
+        "audio_seconds": round(audio_seconds, 2),
+        "elapsed_seconds": round(elapsed, 2),
+        "cached": cached,
+        # Real-time factor: processing time per second of audio (lower is faster)
+        "rtf": round(elapsed / audio_seconds, 4) if audio_seconds and not cached else None,
+        "memory_mb": get_model_memory(model_name),
+        "references": references,
+        "hypotheses": {name: transcriptions[name].lower() for name in references}
     }
 
+def compare_quantized(results):
+    """
+    Compare every "<model>_int8" result with its fp32 counterpart
+
+    Error rates are compared over the files both models transcribed, so a file
+    that failed for one of them does not count towards the delta.
+    """
+    by_model = {result["model"]: result for result in results}
+    comparisons = []
+    for name, quantized in by_model.items():
+        base = by_model.get(name[:-len("_int8")]) if name.endswith("_int8") else None
+        if base is None:
+            continue
+        common = [f for f in base["hypotheses"] if f in quantized["hypotheses"]]
+        if not common:
+            continue
+        truth = [base["references"][f] for f in common]
+        base_hypothesis = [base["hypotheses"][f] for f in common]
+        quantized_hypothesis = [quantized["hypotheses"][f] for f in common]
+        comparisons.append({
+            "model": base["model"],
+            "quantized_model": name,
+            "samples": len(common),
+            "wer_delta": jiwer.wer(truth, quantized_hypothesis) - jiwer.wer(truth, base_hypothesis),
+            "cer_delta": jiwer.cer(truth, quantized_hypothesis) - jiwer.cer(truth, base_hypothesis),
+            "speedup": base["rtf"] / quantized["rtf"] if base["rtf"] and quantized["rtf"] else None,
+            "memory_ratio": quantized["memory_mb"] / base["memory_mb"] if base["memory_mb"] and quantized["memory_mb"] else None
+        })
+    return comparisons
+
+def format_report(results, comparisons):
+    """Markdown table of accuracy and speed per model, followed by the int8 comparisons"""
+    lines = [
+        "| Model | WER | CER | RTF | Memory, MB | Samples |",
+        "|-------|-----|-----|-----|------------|---------|"
+    ]
+    for r in results:
+        rtf = f"{r['rtf']:.4f}" if r["rtf"] is not None else "-"
+        memory = f"{r['memory_mb']:.0f}" if r["memory_mb"] is not None else "-"
+        lines.append(f"| {r['model']} | {r['wer']:.4f} | {r['cer']:.4f} | {rtf} | {memory} | {r['samples']} |")
+    if comparisons:
+        lines += [
+            "",
+            "| Quantized | Baseline | WER delta | CER delta | Speedup | Memory | Samples |",
+            "|-----------|----------|-----------|-----------|---------|--------|---------|"
+        ]
+        for c in comparisons:
+            speedup = f"{c['speedup']:.2f}x" if c["speedup"] is not None else "-"
+            memory = f"{c['memory_ratio'] * 100:.0f}%" if c["memory_ratio"] is not None else "-"
+            lines.append(
+                f"| {c['quantized_model']} | {c['model']} | {c['wer_delta']:+.4f} | {c['cer_delta']:+.4f} | {speedup} | {memory} | {c['samples']} |"
+            )
+    return "\n".join(lines) + "\n"
+
 def main():
     parser = argparse.ArgumentParser(description='Evaluate ASR models on medical speech')
     parser.add_argument('--models', nargs='+', default=['ctc', 'rnnt', 'whisperx'],
-                      help='List of models to evaluate')
+                      help='List of models to evaluate, e.g. rnnt rnnt_int8 to measure quantization')
+    parser.add_argument('--batch-size', type=int, default=0,
+                      help='Send files to /transcribe/batch in groups of this size (0 sends them one by one)')
     args = parser.parse_args()
     
     audio_dir = "data/asr_data"
@@ -68,20 +222,28 @@ def main():
     results = []
     for model in args.models:
         print(f"\nEvaluating {model}...")
-        result = evaluate_model(model, audio_dir, meta_file)
+        result = evaluate_model(model, audio_dir, meta_file, batch_size=args.batch_size)
         results.append(result)
         
         print(f"WER: {result['wer']:.4f}")
         print(f"CER: {result['cer']:.4f}")
+        print(f"RTF: {result['rtf']}")
         print(f"Samples processed: {result['samples']}")
     
+    comparisons = compare_quantized(results)
+    report = format_report(results, comparisons)
+    print("\n" + report)
+    
     # Save results
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     results_file = f"data/asr_results_{timestamp}.json"
     with open(results_file, 'w', encoding='utf8') as f:
         json.dump(results, f, indent=2, ensure_ascii=False)
+    report_file = f"data/asr_report_{timestamp}.md"
+    with open(report_file, 'w', encoding='utf8') as f:
+        f.write(report)
     
-    print(f"\nResults saved to {results_file}")
+    print(f"\nResults saved to {results_file}, report saved to {report_file}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
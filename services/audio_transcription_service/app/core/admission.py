@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+QUEUE_WAIT_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Weight of the newest request in the running service time estimate
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted; carries the HTTP status and a retry hint."""
+
+    def __init__(self, status_code: int, retry_after: int, message: str):
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class _ModelQueue:
+    """Admission state of one model type."""
+
+    def __init__(self):
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.service_seconds = 1.0
+        # Service time per second of audio, known once a request with a known duration finished
+        self.seconds_per_audio_second: Optional[float] = None
+
+
+class AdmissionTicket:
+    """A slot held by an admitted request; release it exactly once when the request is done."""
+
+    def __init__(self, controller: "AdmissionController", model_type: str):
+        self.model_type = model_type
+        self._controller = controller
+        self._admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self, audio_seconds: Optional[float] = None, record: bool = True) -> None:
+        """
+        Args:
+            audio_seconds: Length of the audio the request transcribed, if known
+            record: Whether the time the slot was held counts towards the model's service time
+        """
+        if self._released:
+            return
+        self._released = True
+        service_seconds = time.monotonic() - self._admitted_at if record else None
+        self._controller._release(self.model_type, service_seconds, audio_seconds)
+
+
+class AdmissionController:
+    """
+    Bounded per-model admission queue in front of the transcription endpoints.
+
+    At most max_active requests per model type are processed at once and at
+    most max_queued wait for a slot, in arrival order. A request that finds the
+    queue full is rejected at once with 429, and one that waits longer than
+    max_wait_seconds is shed with 503. Both carry a Retry-After estimate based
+    on the model's recent service time, so admitted requests keep a predictable
+    latency under overload instead of all slowing down together.
+    """
+
+    def __init__(
+        self,
+        max_active: Optional[Dict[str, int]] = None,
+        max_queued: Optional[Dict[str, int]] = None,
+        default_active: int = 8,
+        default_queued: int = 16,
+        max_wait_seconds: float = 30.0,
+    ):
+        """
+        Args:
+            max_active: Concurrently processed requests per model type (0 disables admission control)
+            max_queued: Requests allowed to wait for a slot per model type
+            default_active: Limit for model types not listed in max_active
+            default_queued: Queue size for model types not listed in max_queued
+            max_wait_seconds: Queued requests are shed after waiting this long
+        """
+        self.max_active = dict(max_active or {})
+        self.max_queued = dict(max_queued or {})
+        self.default_active = default_active
+        self.default_queued = max(0, default_queued)
+        self.max_wait_seconds = max_wait_seconds
+        self._queues: Dict[str, _ModelQueue] = {}
+
+    def _queue(self, model_type: str) -> _ModelQueue:
+        queue = self._queues.get(model_type)
+        if queue is None:
+            queue = _ModelQueue()
+            self._queues[model_type] = queue
+        return queue
+
+    def limits(self, model_type: str):
+        """Return (max_active, max_queued) for a model type"""
+        return (
+            self.max_active.get(model_type, self.default_active),
+            max(0, self.max_queued.get(model_type, self.default_queued)),
+        )
+
+    def queue_depth(self, model_type: str) -> int:
+        """Number of requests waiting for a slot"""
+        return len(self._queue(model_type).waiters)
+
+    def retry_after(self, model_type: str) -> int:
+        """Seconds until a new request would likely get a slot"""
+        queue = self._queue(model_type)
+        max_active, _ = self.limits(model_type)
+        wait = queue.service_seconds * (len(queue.waiters) + 1) / max(1, max_active)
+        return min(max(1, math.ceil(wait)), 600)
+
+    def has_free_slot(self, model_type: str) -> bool:
+        """Whether a new request would be admitted without waiting"""
+        queue = self._queue(model_type)
+        max_active, _ = self.limits(model_type)
+        return max_active <= 0 or (queue.active < max_active and not queue.waiters)
+
+    def predicted_latency(self, model_type: str, audio_seconds: Optional[float] = None) -> float:
+        """
+        Expected seconds from arrival to completion of a new request
+
+        Args:
+            model_type: Model the request would run on
+            audio_seconds: Length of the request's audio; its own service time is then
+                predicted from the model's time per second of audio instead of the
+                average request, which a single long recording would skew
+        """
+        queue = self._queue(model_type)
+        max_active, _ = self.limits(model_type)
+        if audio_seconds and queue.seconds_per_audio_second is not None:
+            service_seconds = queue.seconds_per_audio_second * audio_seconds
+        else:
+            service_seconds = queue.service_seconds
+        if self.has_free_slot(model_type):
+            return service_seconds
+        return service_seconds + queue.service_seconds * (len(queue.waiters) + 1) / max_active
+
+    def try_admit(self, model_type: str) -> Optional[AdmissionTicket]:
+        """Take a processing slot for model_type only if one is free right now, without queueing"""
+        if not self.has_free_slot(model_type):
+            return None
+        self._queue(model_type).active += 1
+        return AdmissionTicket(self, model_type)
+
+    async def admit(self, model_type: str) -> AdmissionTicket:
+        """
+        Wait for a processing slot for model_type
+
+        Returns:
+            Ticket to release once the request is finished
+
+        Raises:
+            AdmissionRejected: If the queue is full (429) or the wait timed out (503)
+        """
+        queue = self._queue(model_type)
+        max_active, max_queued = self.limits(model_type)
+        wait_histogram = metrics.histogram("admission_queue_wait_seconds", buckets=QUEUE_WAIT_BUCKETS, model_type=model_type)
+        if max_active <= 0 or (queue.active < max_active and not queue.waiters):
+            queue.active += 1
+            wait_histogram.observe(0.0)
+            return AdmissionTicket(self, model_type)
+
+        if len(queue.waiters) >= max_queued:
+            metrics.counter("admission_rejected_total", model_type=model_type, reason="queue_full").inc()
+            raise AdmissionRejected(
+                429, self.retry_after(model_type),
+                f"Too many {model_type} requests in progress; try again later"
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # The slot was handed over just as the request gave up: pass it on
+                self._release(model_type, None)
+            else:
+                waiter.cancel()
+                queue.waiters.remove(waiter)
+            wait_histogram.observe(time.monotonic() - started)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            metrics.counter("admission_rejected_total", model_type=model_type, reason="timeout").inc()
+            raise AdmissionRejected(
+                503, self.retry_after(model_type),
+                f"Service is overloaded: no {model_type} slot became free within {self.max_wait_seconds:g}s"
+            )
+        wait_histogram.observe(time.monotonic() - started)
+        return AdmissionTicket(self, model_type)
+
+    def _release(self, model_type: str, service_seconds: Optional[float], audio_seconds: Optional[float] = None) -> None:
+        queue = self._queue(model_type)
+        if service_seconds is not None:
+            queue.service_seconds += SERVICE_TIME_SMOOTHING * (service_seconds - queue.service_seconds)
+            if audio_seconds:
+                rtf = service_seconds / audio_seconds
+                if queue.seconds_per_audio_second is None:
+                    queue.seconds_per_audio_second = rtf
+                else:
+                    queue.seconds_per_audio_second += SERVICE_TIME_SMOOTHING * (rtf - queue.seconds_per_audio_second)
+        while queue.waiters:
+            waiter = queue.waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next request so newcomers cannot overtake it
+                waiter.set_result(None)
+                return
+        queue.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        result = {}
+        for model_type, queue in sorted(self._queues.items()):
+            max_active, max_queued = self.limits(model_type)
+            result[model_type] = {
+                "active": queue.active,
+                "queued": len(queue.waiters),
+                "max_active": max_active,
+                "max_queued": max_queued,
+                "service_seconds": round(queue.service_seconds, 3),
+                "seconds_per_audio_second": (
+                    round(queue.seconds_per_audio_second, 4) if queue.seconds_per_audio_second is not None else None
+                ),
+            }
+        return result
@@ -0,0 +1,48 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AlignmentModelCache:
+    """Loads WhisperX alignment models once per language and reuses them."""
+
+    def __init__(self, loader: Callable[[str], Tuple[Any, Dict[str, Any]]]):
+        """
+        Args:
+            loader: Callable taking a language code and returning (align_model, metadata)
+        """
+        self.loader = loader
+        self._models: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        self._load_times: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, language: str) -> Tuple[Any, Dict[str, Any]]:
+        """Return (align_model, metadata) for language, loading it on first use"""
+        cached = self._models.get(language)
+        if cached is not None:
+            return cached
+        with self._lock:
+            language_lock = self._locks.setdefault(language, threading.Lock())
+        with language_lock:
+            cached = self._models.get(language)
+            if cached is None:
+                logger.info(f"Loading WhisperX alignment model for '{language}'")
+                started = time.perf_counter()
+                cached = self.loader(language)
+                self._load_times[language] = time.perf_counter() - started
+                self._models[language] = cached
+                logger.info(f"Loaded alignment model for '{language}' in {self._load_times[language]:.2f}s")
+        return cached
+
+    def languages(self) -> List[str]:
+        return sorted(self._models)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            language: {"load_time_seconds": round(self._load_times[language], 3)}
+            for language in self.languages()
+        }
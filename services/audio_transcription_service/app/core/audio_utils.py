@@ -1,12 +1,148 @@
 import os
+import wave
 import logging
 import tempfile
 import subprocess
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.probe import probe_audio
 
 logger = logging.getLogger(__name__)
 
+SAMPLE_RATE = 16000
+
+class AudioDecodeError(Exception):
+    """Raised when an input file cannot be decoded to PCM audio"""
+
+def _read_pcm_wav(file_path: str, sample_rate: int) -> Optional[np.ndarray]:
+    """
+    Read a WAV file directly if it is already 16-bit mono PCM at sample_rate
+
+    Returns:
+        Float32 samples in [-1, 1], or None if the file needs ffmpeg
+    """
+    try:
+        with wave.open(file_path, "rb") as wav:
+            if wav.getnchannels() != 1 or wav.getsampwidth() != 2 or wav.getframerate() != sample_rate:
+                return None
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+
+def _ffmpeg_pcm_command(file_path: str, sample_rate: int) -> List[str]:
+    """ffmpeg arguments that write the first audio stream as mono s16le PCM to stdout"""
+    return [
+        "ffmpeg",
+        "-nostdin",
+        "-threads", "0",
+        "-i", file_path,
+        "-map", "0:a:0",
+        "-vn", "-sn", "-dn",
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate),
+        "-"
+    ]
+
+def _ffmpeg_error(stderr: bytes) -> AudioDecodeError:
+    text = stderr.decode(errors="ignore")
+    if "matches no streams" in text:
+        return AudioDecodeError("File contains no audio stream")
+    message = text.strip().splitlines()
+    return AudioDecodeError(f"Failed to decode audio: {message[-1] if message else 'ffmpeg failed'}")
+
+def decode_audio(file_path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode any audio container to mono float32 samples in memory
+    
+    WAV files that are already 16-bit mono PCM at the target rate are read
+    directly; everything else goes through a single ffmpeg process whose raw
+    PCM output is piped straight into a NumPy buffer. For video containers
+    only the first audio stream is demuxed and decoded; video, subtitle and
+    data streams are never decoded.
+    
+    Args:
+        file_path: Path to the input file (wav, mp3, m4a, ogg, mp4, mov, mkv, ...)
+        sample_rate: Target sample rate
+        
+    Returns:
+        1-D float32 array with samples in [-1, 1]
+        
+    Raises:
+        AudioDecodeError: If ffmpeg cannot decode the file
+    """
+    samples = _read_pcm_wav(file_path, sample_rate)
+    if samples is not None:
+        return samples
+    
+    try:
+        result = subprocess.run(_ffmpeg_pcm_command(file_path, sample_rate), capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise _ffmpeg_error(e.stderr) from e
+    except FileNotFoundError as e:
+        raise AudioDecodeError("ffmpeg is not installed") from e
+    
+    return np.frombuffer(result.stdout, dtype="<i2").astype(np.float32) / 32768.0
+
+def iter_audio_windows(file_path: str, window_samples: int, sample_rate: int = SAMPLE_RATE) -> Iterator[np.ndarray]:
+    """
+    Decode a file as consecutive fixed-size windows of mono float32 samples
+    
+    16-bit mono PCM WAV files at the target rate are memory-mapped and only the
+    current window is converted; everything else is decoded by an ffmpeg
+    process whose output is read one window at a time. Either way at most one
+    window is held in memory, regardless of the length of the recording.
+    
+    Args:
+        file_path: Path to the input file
+        window_samples: Number of samples per window (the last one may be shorter)
+        sample_rate: Target sample rate
+        
+    Yields:
+        1-D float32 arrays with samples in [-1, 1]
+        
+    Raises:
+        AudioDecodeError: If ffmpeg cannot decode the file
+    """
+    info = probe_audio(file_path, use_ffprobe=False)
+    if (info is not None and info.format == "wav" and info.data_offset is not None
+            and info.sample_width == 2 and info.channels == 1 and info.sample_rate == sample_rate):
+        n_samples = info.data_size // 2
+        if n_samples <= 0:
+            return
+        samples = np.memmap(file_path, dtype="<i2", mode="r", offset=info.data_offset, shape=(n_samples,))
+        for start in range(0, n_samples, window_samples):
+            yield samples[start:start + window_samples].astype(np.float32) / 32768.0
+        return
+    
+    # stderr goes to a file so a chatty ffmpeg cannot block on a full pipe
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            process = subprocess.Popen(
+                _ffmpeg_pcm_command(file_path, sample_rate), stdout=subprocess.PIPE, stderr=stderr
+            )
+        except FileNotFoundError as e:
+            raise AudioDecodeError("ffmpeg is not installed") from e
+        try:
+            while True:
+                data = process.stdout.read(window_samples * 2)
+                if not data:
+                    break
+                yield np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+            if process.wait() != 0:
+                stderr.seek(0)
+                raise _ffmpeg_error(stderr.read())
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            process.stdout.close()
+
 def get_audio_duration(file_path: str) -> Optional[float]:
     """
     Get the duration of an audio file in seconds
@@ -17,20 +153,11 @@ def get_audio_duration(file_path: str) -> Optional[float]:
     Returns:
         Duration in seconds or None if there was an error
     """
-    try:
-        cmd = [
-            "ffprobe", 
-            "-v", "error", 
-            "-show_entries", "format=duration", 
-            "-of", "default=noprint_wrappers=1:nokey=1", 
-            file_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        duration = float(result.stdout.strip())
-        return duration
-    except Exception as e:
-        logger.error(f"Error getting audio duration: {str(e)}")
+    info = probe_audio(file_path)
+    if info is None or info.duration is None:
+        logger.error(f"Error getting audio duration of {file_path}")
         return None
+    return info.duration
 
 def convert_audio_format(input_path: str, target_format: str = "wav") -> Optional[str]:
     """
@@ -72,18 +199,4 @@ def is_valid_audio_file(file_path: str) -> bool:
     Returns:
         True if the file is a valid audio file, False otherwise
     """
-    try:
-        cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-show_entries", "stream=codec_type",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            file_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Check if at least one stream is of type 'audio'
-        return 'audio' in result.stdout
-    except Exception as e:
-        logger.error(f"Error validating audio file: {str(e)}")
-        return False 
\ No newline at end of file
+    return probe_audio(file_path) is not None
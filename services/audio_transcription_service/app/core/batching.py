@@ -0,0 +1,140 @@
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+import numpy as np
+import torch
+
+from app.core.audio_utils import SAMPLE_RATE
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# GigaAM refuses short-form inputs longer than this (see transcribe_longform)
+SHORTFORM_MAX_SECONDS = 25.0
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def transcribe_batch(model, wavs: List[np.ndarray]) -> List[str]:
+    """
+    Run one padded forward pass of a GigaAM model over several waveforms
+
+    Args:
+        model: Loaded GigaAM CTC or RNNT model
+        wavs: 1-D float32 waveforms at 16 kHz
+
+    Returns:
+        Transcriptions in the same order as wavs
+    """
+    with torch.inference_mode():
+        tensors = [torch.from_numpy(np.ascontiguousarray(wav, dtype=np.float32)) for wav in wavs]
+        lengths = torch.tensor([tensor.shape[-1] for tensor in tensors], device=model._device)
+        batch = torch.nn.utils.rnn.pad_sequence(tensors, batch_first=True)
+        batch = batch.to(model._device).to(model._dtype)
+        encoded, encoded_len = model.forward(batch, lengths)
+        return model.decoding.decode(model.head, encoded, encoded_len)
+
+
+def transcribe_waveform(model, wav: np.ndarray) -> str:
+    """Transcribe a single in-memory waveform with a GigaAM model"""
+    return transcribe_batch(model, [wav])[0]
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests for one model into batched forward passes.
+
+    The first queued item opens a batch; the batch is flushed when it reaches
+    max_batch_size or when max_wait_ms has elapsed since it was opened.
+    """
+
+    def __init__(
+        self,
+        model_type: str,
+        run_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+    ):
+        """
+        Args:
+            model_type: Model the batches are run on (used for metrics and logs)
+            run_batch: Coroutine that transcribes a list of items and returns one
+                result per item; an Exception in the list fails only that item
+            max_batch_size: Maximum number of items per forward pass
+            max_wait_ms: Maximum time the first item waits for the batch to fill
+        """
+        self.model_type = model_type
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+        self._batch_size = metrics.histogram("batch_size", buckets=BATCH_SIZE_BUCKETS, model_type=model_type)
+        self._batch_wait = metrics.histogram("batch_wait_seconds", model_type=model_type)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            # Start from an empty context so batches never inherit the state (e.g. stage timings)
+            # of the request that happened to start the batcher
+            self._task = contextvars.Context().run(asyncio.create_task, self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Batches already collected still answer their requests
+        await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result from a batched pass"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.monotonic()))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future, float]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _loop(self) -> None:
+        while True:
+            batch = await self._collect()
+            now = time.monotonic()
+            for _, _, queued_at in batch:
+                self._batch_wait.observe(now - queued_at)
+            self._batch_size.observe(len(batch))
+            # Run the batch in the background so the next one can start collecting; the task is
+            # referenced until it finishes, as the loop only keeps weak references to tasks
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        items = [item for item, _, _ in batch]
+        try:
+            results = await self.run_batch(items)
+        except Exception as e:
+            logger.error(f"Batched {self.model_type} transcription of {len(items)} items failed: {str(e)}")
+            results = [e] * len(items)
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
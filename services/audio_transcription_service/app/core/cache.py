@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionCache:
+    """
+    Disk-backed LRU cache of transcription results.
+
+    Each entry is a JSON file named after its key. Recency is tracked in
+    memory and mirrored in the file mtime, so the LRU order survives restarts.
+    Server processes sharing the directory keep separate indexes; an entry
+    written by another process is picked up when it is first looked up.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        """
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Total size cap; least recently used entries are evicted above it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_index()
+
+    @staticmethod
+    def make_key(
+        content_hash: str,
+        model_type: str,
+        long_form: bool,
+        model_version: str,
+        speakers: bool = False,
+        segmentation: str = ""
+    ) -> str:
+        """
+        Build the cache key for an audio file and the settings it was transcribed with
+
+        Args:
+            content_hash: SHA-256 of the audio file
+            model_type: Model that transcribed it
+            long_form: Whether the long-form mode was used
+            model_version: Checkpoint of the model
+            speakers: Whether utterances are labelled with speakers
+            segmentation: Fingerprint of the settings that decide how audio is cut before inference
+        """
+        raw = f"{content_hash}:{model_type}:{int(long_form)}:{model_version}"
+        if speakers:
+            raw += ":speakers"
+        if segmentation:
+            raw += f":{segmentation}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> None:
+        files = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self._total_bytes += size
+        logger.info(f"Loaded transcription cache with {len(self._entries)} entries ({self._total_bytes} bytes)")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None on a miss"""
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries:
+                size = self._adopt_size(path)
+                if size is None:
+                    self.misses += 1
+                    return None
+                self._entries[key] = size
+                self._total_bytes += size
+            self._entries.move_to_end(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cache entry {key}: {str(e)}")
+            self._discard(key)
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    @staticmethod
+    def _adopt_size(path: Path) -> Optional[int]:
+        """Size of an entry written by another server process, or None if there is none"""
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result and evict least recently used entries over the size cap"""
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        if self.max_bytes and len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            evicted = []
+            while self.max_bytes and self._total_bytes > self.max_bytes and self._entries:
+                old_key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._remove_file(old_key)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} transcription cache entries")
+
+    def _discard(self, key: str) -> None:
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+        self._remove_file(key)
+
+    def _remove_file(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
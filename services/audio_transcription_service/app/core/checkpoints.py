@@ -0,0 +1,178 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.database import ProcessLocalDatabase
+
+logger = logging.getLogger(__name__)
+
+# (start_sample, end_sample, transcription) of a decoded segment
+SegmentResult = Tuple[int, int, str]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    checkpoint_key TEXT NOT NULL,
+    start_sample INTEGER NOT NULL,
+    end_sample INTEGER NOT NULL,
+    transcription TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (checkpoint_key, start_sample, end_sample)
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    params TEXT NOT NULL,
+    upload TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+JOB_COLUMNS = {
+    "status": "TEXT NOT NULL DEFAULT 'queued'",
+    "owner": "TEXT NOT NULL DEFAULT ''",
+    "error": "TEXT",
+    "updated_at": "REAL",
+}
+
+UNFINISHED_STATUSES = ("queued", "processing")
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Add the job columns missing from databases created by older versions"""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+    for column, definition in JOB_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+
+
+class CheckpointStore:
+    """
+    SQLite store that lets long-form transcriptions survive a restart.
+
+    Segment results are keyed by the recording's checkpoint key and the
+    segment's sample range. Any later request for the same audio and model
+    version therefore reuses them, whether it is a resumed job or a client
+    retry. Jobs are recorded together with their spool file and the server
+    process that owns them, so jobs whose owner is gone can be re-enqueued,
+    and so any server process can report the status of any job.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: SQLite database file, created if missing
+        """
+        self._db = ProcessLocalDatabase(db_path, SCHEMA, migrate=_migrate)
+
+    @staticmethod
+    def make_key(content_hash: str, model_type: str, model_version: str) -> str:
+        """Build the checkpoint key for an audio file and the model transcribing it"""
+        return hashlib.sha256(f"{content_hash}:{model_type}:{model_version}".encode()).hexdigest()
+
+    def load_segments(self, key: str) -> Dict[Tuple[int, int], str]:
+        """Return the stored transcriptions of a recording by (start_sample, end_sample)"""
+        with self._db.connection() as conn:
+            rows = conn.execute(
+                "SELECT start_sample, end_sample, transcription FROM segments WHERE checkpoint_key = ?", (key,)
+            ).fetchall()
+        return {(start, end): transcription for start, end, transcription in rows}
+
+    def save_segments(self, key: str, results: List[SegmentResult]) -> None:
+        now = time.time()
+        with self._db.connection() as conn, conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?)",
+                [(key, start, end, transcription, now) for start, end, transcription in results]
+            )
+
+    def clear_segments(self, key: str) -> None:
+        with self._db.connection() as conn:
+            conn.execute("DELETE FROM segments WHERE checkpoint_key = ?", (key,))
+
+    def save_job(self, job_id: str, params: Dict[str, Any], upload: Dict[str, Any], owner: str) -> None:
+        """
+        Record a queued job and the spool file it reads
+
+        Args:
+            job_id: Id of the job
+            params: Request parameters of the job
+            upload: Spool file path and metadata
+            owner: Server process holding the job in its queue
+        """
+        now = time.time()
+        with self._db.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, params, upload, created_at, status, owner, error, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, NULL, ?)",
+                (job_id, json.dumps(params, ensure_ascii=False), json.dumps(upload, ensure_ascii=False), now, owner, now)
+            )
+
+    def set_job_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        with self._db.connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE job_id = ?",
+                (status, error, time.time(), job_id)
+            )
+
+    def finish_job(self, job_id: str) -> None:
+        """Forget a completed job; its result is kept by the transcription store"""
+        with self._db.connection() as conn:
+            conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._db.connection() as conn:
+            row = conn.execute(
+                "SELECT job_id, params, status, error, created_at, updated_at FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, params, status, error, created_at, updated_at = row
+        job = {
+            "job_id": job_id,
+            "status": status,
+            "params": json.loads(params),
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+        if error is not None:
+            job["error"] = error
+        return job
+
+    def unfinished_jobs(self) -> List[Dict[str, Any]]:
+        """Jobs that are queued or running, oldest first"""
+        with self._db.connection() as conn:
+            rows = conn.execute(
+                f"SELECT job_id, params, upload, owner FROM jobs WHERE status IN ({','.join('?' * len(UNFINISHED_STATUSES))}) "
+                "ORDER BY created_at",
+                UNFINISHED_STATUSES
+            ).fetchall()
+        return [
+            {"job_id": job_id, "params": json.loads(params), "upload": json.loads(upload), "owner": owner}
+            for job_id, params, upload, owner in rows
+        ]
+
+    def claim_job(self, job_id: str, previous_owner: str, owner: str) -> bool:
+        """Take over a job from a server process that is gone; only one claimant succeeds"""
+        with self._db.connection() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET owner = ?, status = 'queued', updated_at = ? WHERE job_id = ? AND owner = ?",
+                (owner, time.time(), job_id, previous_owner)
+            )
+        return cursor.rowcount == 1
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Delete segment results of requests that were never retried and failed jobs older than max_age_seconds"""
+        cutoff = time.time() - max_age_seconds
+        with self._db.connection() as conn:
+            cursor = conn.execute("DELETE FROM segments WHERE created_at < ?", (cutoff,))
+            conn.execute("DELETE FROM jobs WHERE status = 'failed' AND updated_at < ?", (cutoff,))
+        if cursor.rowcount:
+            logger.info(f"Pruned {cursor.rowcount} expired segment checkpoints")
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self._db.close()
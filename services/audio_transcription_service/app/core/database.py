@@ -0,0 +1,61 @@
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessLocalDatabase:
+    """
+    SQLite connection that is opened separately in every process using it.
+
+    A connection must not be used across fork(), so a process forked after
+    the store was created (e.g. a preforked server worker) transparently opens
+    its own. Within a process the connection is shared by all threads and
+    serialized with a lock.
+    """
+
+    def __init__(self, db_path: Path, schema: str, migrate: Optional[Callable[[sqlite3.Connection], None]] = None):
+        """
+        Args:
+            db_path: SQLite database file, created if missing
+            schema: Statements creating the tables, run on every connect
+            migrate: Optional callback that upgrades tables created by older versions
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.schema = schema
+        self.migrate = migrate
+        self._pid: Optional[int] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self) -> None:
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.schema)
+        if self.migrate is not None:
+            self.migrate(self._conn)
+        self._pid = os.getpid()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Yield this process's connection, holding its lock"""
+        if self._pid != os.getpid():
+            # Forked: the inherited connection and lock belong to the parent
+            self._lock = threading.Lock()
+            self._connect()
+        with self._lock:
+            yield self._conn
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            with self._lock:
+                self._conn.close()
+        self._conn = None
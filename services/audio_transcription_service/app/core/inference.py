@@ -0,0 +1,123 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.timing import stage
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceExecutor:
+    """
+    Runs blocking model inference off the asyncio event loop.
+
+    Work is dispatched to a thread or process pool, and the number of
+    concurrent calls per model type is capped by a semaphore so that one
+    model cannot occupy every worker.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: Optional[int] = None,
+        model_concurrency: Optional[Dict[str, int]] = None,
+        default_concurrency: int = 1,
+    ):
+        """
+        Args:
+            kind: "thread" or "process"
+            max_workers: Size of the pool (defaults to the number of CPUs)
+            model_concurrency: Maximum concurrent inference calls per model type
+            default_concurrency: Limit for model types not listed in model_concurrency
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Invalid executor kind: {kind}. Must be 'thread' or 'process'")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.model_concurrency = dict(model_concurrency or {})
+        self.default_concurrency = max(1, default_concurrency)
+        self._executor: Optional[Executor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._active: Dict[str, int] = {}
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        if self.kind == "process":
+            # Forked workers inherit the models already loaded in the parent
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("fork")
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="inference"
+            )
+        logger.info(f"Started {self.kind} inference executor with {self.max_workers} workers")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def limit_for(self, model_type: str) -> int:
+        return max(1, self.model_concurrency.get(model_type, self.default_concurrency))
+
+    def _semaphore(self, model_type: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(model_type)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limit_for(model_type))
+            self._semaphores[model_type] = semaphore
+        return semaphore
+
+    async def run(self, model_type: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) in the pool once a slot for model_type is free
+
+        Args:
+            model_type: Model the call belongs to, used for the concurrency limit
+            func: Blocking callable; must be picklable for the process executor
+
+        Returns:
+            The return value of func
+        """
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore(model_type)
+        with stage("executor_wait"):
+            await semaphore.acquire()
+        self._active[model_type] = self._active.get(model_type, 0) + 1
+        try:
+            call = functools.partial(func, *args, **kwargs)
+            if self.kind == "thread":
+                # Context variables (e.g. request stage timings) follow the call into the worker thread
+                call = functools.partial(contextvars.copy_context().run, call)
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            self._active[model_type] -= 1
+            semaphore.release()
+
+    async def run_blocking(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run blocking I/O or preprocessing in the default thread pool"""
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        model_types = set(self.model_concurrency) | set(self._active)
+        return {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "models": {
+                model_type: {
+                    "limit": self.limit_for(model_type),
+                    "active": self._active.get(model_type, 0)
+                }
+                for model_type in sorted(model_types)
+            }
+        }
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_PROCESSING = "processing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+FINAL_STATUSES = (JOB_COMPLETED, JOB_FAILED)
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue has no free slots for a new job."""
+
+
+class TranscriptionJob:
+    """State of a single queued transcription."""
+
+    def __init__(self, job_id: str, params: Dict[str, Any]):
+        self.id = job_id
+        self.params = params
+        self.status = JOB_QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self._changed = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+    async def publish(self, status: str, **fields) -> None:
+        """
+        Record a progress event and wake up stream listeners
+
+        Args:
+            status: Event status, e.g. "processing" or "utterance"
+            **fields: Additional event payload
+        """
+        event = {"status": status, "job_id": self.id}
+        event.update(fields)
+        async with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+JobRunner = Callable[[TranscriptionJob], Awaitable[Dict[str, Any]]]
+
+
+class JobManager:
+    """Bounded queue of transcription jobs served by a fixed pool of workers."""
+
+    def __init__(self, worker_count: int = 2, max_queue_size: int = 100, retention_seconds: float = 3600):
+        """
+        Args:
+            worker_count: Number of jobs processed concurrently
+            max_queue_size: Maximum number of jobs waiting for a worker
+            retention_seconds: How long finished jobs stay available for status/result requests
+        """
+        self.worker_count = max(1, worker_count)
+        self.max_queue_size = max_queue_size
+        self.retention_seconds = retention_seconds
+        self.jobs: Dict[str, TranscriptionJob] = {}
+        self._runners: Dict[str, JobRunner] = {}
+        self._cleanups: Dict[str, Callable[[], None]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.worker_count)
+        ]
+        logger.info(f"Started {self.worker_count} transcription job workers (queue size {self.max_queue_size})")
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def queue_full(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    def submit(
+        self,
+        runner: JobRunner,
+        params: Dict[str, Any],
+        cleanup: Optional[Callable[[], None]] = None,
+        job_id: Optional[str] = None,
+    ) -> TranscriptionJob:
+        """
+        Enqueue a new job
+
+        Args:
+            runner: Coroutine function that performs the work and returns the result
+            params: Request parameters stored with the job
+            cleanup: Optional callback invoked once the job has finished
+            job_id: Id to use instead of a new one, e.g. for a job resumed after a restart
+
+        Returns:
+            The created job
+
+        Raises:
+            JobQueueFull: If the queue is at capacity
+        """
+        if self._queue is None:
+            raise RuntimeError("JobManager is not started")
+        self._prune()
+
+        job = TranscriptionJob(job_id or str(uuid.uuid4()), params)
+        try:
+            self._queue.put_nowait(job.id)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Transcription queue is full ({self.max_queue_size} jobs)")
+
+        self.jobs[job.id] = job
+        self._runners[job.id] = runner
+        if cleanup is not None:
+            self._cleanups[job.id] = cleanup
+        job.events.append({"status": JOB_QUEUED, "job_id": job.id, "queue_position": self.queue_depth})
+        logger.info(f"Queued transcription job {job.id} (queue depth {self.queue_depth})")
+        return job
+
+    def get(self, job_id: str) -> Optional[TranscriptionJob]:
+        return self.jobs.get(job_id)
+
+    async def stream(self, job: TranscriptionJob) -> AsyncIterator[Dict[str, Any]]:
+        """Yield all events of a job, waiting for new ones until the job finishes."""
+        index = 0
+        while True:
+            async with job._changed:
+                while index >= len(job.events) and not job.finished:
+                    await job._changed.wait()
+                pending = job.events[index:]
+                finished = job.finished
+            for event in pending:
+                yield event
+            index += len(pending)
+            if finished and index >= len(job.events):
+                return
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self.jobs.get(job_id)
+                runner = self._runners.pop(job_id, None)
+                if job is None or runner is None:
+                    continue
+                await self._run(job, runner)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: TranscriptionJob, runner: JobRunner) -> None:
+        job.status = JOB_PROCESSING
+        job.started_at = time.time()
+        await job.publish(JOB_PROCESSING, message="Transcription started")
+        logger.info(f"Processing transcription job {job.id}")
+        try:
+            job.result = await runner(job)
+            job.status = JOB_COMPLETED
+            job.finished_at = time.time()
+            await job.publish(JOB_COMPLETED, result=job.result)
+            logger.info(f"Transcription job {job.id} completed in {job.finished_at - job.started_at:.2f}s")
+        except Exception as e:
+            logger.error(f"Transcription job {job.id} failed: {str(e)}")
+            job.error = str(e)
+            job.status = JOB_FAILED
+            job.finished_at = time.time()
+            await job.publish(JOB_FAILED, message=f"Transcription error: {str(e)}")
+        except asyncio.CancelledError:
+            # Shutting down: keep the job's files so it can be resumed after a restart
+            logger.info(f"Transcription job {job.id} interrupted")
+            self._cleanups.pop(job.id, None)
+            raise
+        finally:
+            cleanup = self._cleanups.pop(job.id, None)
+            if cleanup is not None:
+                try:
+                    cleanup()
+                except Exception as e:
+                    logger.error(f"Error cleaning up job {job.id}: {str(e)}")
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention period."""
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished and job.finished_at is not None and now - job.finished_at > self.retention_seconds
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
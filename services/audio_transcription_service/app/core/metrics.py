@@ -0,0 +1,85 @@
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "count": self.count,
+                "sum": round(self.sum, 6),
+                "mean": round(self.sum / self.count, 6) if self.count else None,
+                "buckets": {str(bound): n for bound, n in zip(self.buckets, self.counts)},
+            }
+
+
+class Counter:
+    """Monotonically increasing counter."""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+def _label_key(labels: Dict[str, Any]) -> str:
+    return ",".join(f"{k}={labels[k]}" for k in sorted(labels)) or "all"
+
+
+class MetricsRegistry:
+    """Process-wide collection of named histograms and counters."""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, str], Counter] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, buckets: Optional[Sequence[float]] = None, **labels) -> Histogram:
+        key = (name, _label_key(labels))
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram(buckets or DEFAULT_BUCKETS)
+            return self._histograms[key]
+
+    def counter(self, name: str, **labels) -> Counter:
+        key = (name, _label_key(labels))
+        with self._lock:
+            if key not in self._counters:
+                self._counters[key] = Counter()
+            return self._counters[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            histograms = list(self._histograms.items())
+            counters = list(self._counters.items())
+        result: Dict[str, Any] = {"histograms": {}, "counters": {}}
+        for (name, labels), histogram in histograms:
+            result["histograms"].setdefault(name, {})[labels] = histogram.to_dict()
+        for (name, labels), counter in counters:
+            result["counters"].setdefault(name, {})[labels] = counter.value
+        return result
+
+
+metrics = MetricsRegistry()
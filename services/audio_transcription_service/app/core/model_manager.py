@@ -0,0 +1,238 @@
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A loader returns the model object and the name of the checkpoint it loaded
+ModelLoader = Callable[[], Tuple[Any, str]]
+
+
+class ModelUnavailable(Exception):
+    """Raised when a model type is unknown or fails to load."""
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of the current process, if it can be determined"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _tensor_bytes(value: Any) -> int:
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(item) for item in value)
+    if type(value).__name__ == "ScriptObject":
+        # Packed weights of quantized LSTM layers expose their tensors through __getstate__
+        try:
+            return _tensor_bytes(value.__getstate__())
+        except Exception:
+            return 0
+    numel = getattr(value, "numel", None)
+    element_size = getattr(value, "element_size", None)
+    if callable(numel) and callable(element_size):
+        return numel() * element_size()
+    return 0
+
+
+def _module_bytes(model: Any) -> Optional[int]:
+    """Size of the state dict if model is a torch module"""
+    # The state dict also covers packed weights of quantized layers, which are
+    # neither parameters nor buffers
+    state_dict = getattr(model, "state_dict", None)
+    if not callable(state_dict):
+        return None
+    try:
+        return sum(_tensor_bytes(value) for value in state_dict().values())
+    except Exception:
+        return None
+
+
+class _ModelEntry:
+    def __init__(self, loader: ModelLoader, default_version: str):
+        self.loader = loader
+        self.version = default_version
+        self.model: Any = None
+        self.load_lock = threading.Lock()
+        self.load_time: Optional[float] = None
+        self.memory_bytes: Optional[int] = None
+        self.last_used: Optional[float] = None
+        self.load_count = 0
+        self.error: Optional[str] = None
+        self.pinned = False
+
+
+class ModelManager:
+    """
+    Loads models on first use and keeps a bounded number of them resident.
+
+    When more than max_resident models are loaded, or their combined memory
+    exceeds memory_budget_bytes, the least recently used models are unloaded.
+    Pinned models, e.g. those loaded before worker processes are forked, are
+    never unloaded and do not count against either limit.
+    """
+
+    def __init__(self, max_resident: int = 2, memory_budget_bytes: int = 0):
+        """
+        Args:
+            max_resident: Maximum number of models kept in memory (0 means unlimited)
+            memory_budget_bytes: Maximum combined model memory (0 means unlimited)
+        """
+        self.max_resident = max_resident
+        self.memory_budget_bytes = memory_budget_bytes
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._resident: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def register(self, model_type: str, loader: ModelLoader, default_version: str) -> None:
+        """
+        Register a lazily loaded model
+
+        Args:
+            model_type: Name used by the API, e.g. "rnnt"
+            loader: Callable returning (model, loaded checkpoint name)
+            default_version: Checkpoint name reported before the model is first loaded
+        """
+        self._entries[model_type] = _ModelEntry(loader, default_version)
+
+    def pin(self, model_type: str) -> Any:
+        """
+        Load a model and keep it resident for the lifetime of the process
+
+        Raises:
+            ModelUnavailable: If the model type is unknown or cannot be loaded
+        """
+        model = self.get(model_type)
+        with self._lock:
+            self._entries[model_type].pinned = True
+            self._resident.pop(model_type, None)
+        return model
+
+    def model_types(self) -> List[str]:
+        return list(self._entries)
+
+    def is_registered(self, model_type: str) -> bool:
+        return model_type in self._entries
+
+    def is_loaded(self, model_type: str) -> bool:
+        entry = self._entries.get(model_type)
+        return entry is not None and entry.model is not None
+
+    def version(self, model_type: str) -> Optional[str]:
+        """Checkpoint name of the model (the expected one if it has not been loaded yet)"""
+        entry = self._entries.get(model_type)
+        return entry.version if entry is not None else None
+
+    def get(self, model_type: str) -> Any:
+        """
+        Return the model, loading it first if necessary
+
+        Raises:
+            ModelUnavailable: If the model type is unknown or cannot be loaded
+        """
+        entry = self._entries.get(model_type)
+        if entry is None:
+            raise ModelUnavailable(f"Unknown model type: {model_type}")
+
+        model = entry.model
+        if model is None:
+            with entry.load_lock:
+                model = entry.model
+                if model is None:
+                    model = self._load(model_type, entry)
+
+        with self._lock:
+            entry.last_used = time.time()
+            if model_type in self._resident:
+                self._resident.move_to_end(model_type)
+        return model
+
+    def _load(self, model_type: str, entry: _ModelEntry) -> Any:
+        logger.info(f"Loading model {model_type}...")
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        try:
+            model, version = entry.loader()
+        except Exception as e:
+            entry.error = str(e)
+            logger.error(f"Failed to load model {model_type}: {str(e)}")
+            raise ModelUnavailable(f"Model {model_type} is not available: {str(e)}") from e
+
+        entry.load_time = time.perf_counter() - started
+        memory_bytes = _module_bytes(model)
+        if memory_bytes is None:
+            rss_after = _rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                memory_bytes = max(0, rss_after - rss_before)
+        entry.memory_bytes = memory_bytes
+        entry.version = version
+        entry.error = None
+        entry.load_count += 1
+
+        with self._lock:
+            entry.model = model
+            if not entry.pinned:
+                self._resident[model_type] = None
+                self._evict(keep=model_type)
+        logger.info(
+            f"Loaded model {model_type} ({version}) in {entry.load_time:.2f}s, "
+            f"memory {self._format_mb(memory_bytes)}"
+        )
+        return model
+
+    def _resident_bytes(self) -> int:
+        return sum(self._entries[name].memory_bytes or 0 for name in self._resident)
+
+    def _evict(self, keep: str) -> None:
+        """Unload least recently used models until the limits are respected"""
+        evicted = False
+        while len(self._resident) > 1:
+            over_count = self.max_resident and len(self._resident) > self.max_resident
+            over_budget = self.memory_budget_bytes and self._resident_bytes() > self.memory_budget_bytes
+            if not over_count and not over_budget:
+                break
+            victim = next(name for name in self._resident if name != keep)
+            self._unload_locked(victim)
+            evicted = True
+        if evicted:
+            gc.collect()
+
+    def _unload_locked(self, model_type: str) -> None:
+        self._resident.pop(model_type, None)
+        entry = self._entries[model_type]
+        entry.model = None
+        logger.info(f"Unloaded model {model_type}")
+
+    def unload(self, model_type: str) -> None:
+        """Unload a model unless it is pinned"""
+        with self._lock:
+            if model_type in self._resident:
+                self._unload_locked(model_type)
+        gc.collect()
+
+    @staticmethod
+    def _format_mb(memory_bytes: Optional[int]) -> str:
+        return f"{memory_bytes / (1024 * 1024):.1f} MB" if memory_bytes is not None else "unknown"
+
+    def info(self) -> Dict[str, Dict[str, Any]]:
+        """Load state, load time and memory of every registered model"""
+        with self._lock:
+            return {
+                model_type: {
+                    "loaded": entry.model is not None,
+                    "version": entry.version,
+                    "load_time_seconds": round(entry.load_time, 3) if entry.load_time is not None else None,
+                    "memory_mb": round(entry.memory_bytes / (1024 * 1024), 1) if entry.memory_bytes is not None else None,
+                    "load_count": entry.load_count,
+                    "pinned": entry.pinned,
+                    "last_used": entry.last_used,
+                    "error": entry.error,
+                }
+                for model_type, entry in self._entries.items()
+            }
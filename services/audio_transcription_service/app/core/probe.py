@@ -0,0 +1,314 @@
+import json
+import logging
+import os
+import struct
+import subprocess
+from typing import Any, BinaryIO, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Only the head and tail of a file are read; everything else is left on disk
+HEAD_BYTES = 64 * 1024
+TAIL_BYTES = 64 * 1024
+# Junk allowed before the first MPEG frame of an MP3 without an ID3 tag
+MP3_MAX_LEADING_BYTES = 4096
+
+MP3_BITRATES = {
+    # (mpeg1, layer) -> kbps by index
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG 1
+    2: (22050, 24000, 16000),  # MPEG 2
+    0: (11025, 12000, 8000),   # MPEG 2.5
+}
+
+
+class AudioInfo:
+    """Stream parameters of an audio file, read from its headers."""
+
+    def __init__(
+        self,
+        format: str,
+        duration: Optional[float],
+        sample_rate: Optional[int],
+        channels: Optional[int],
+        sample_width: Optional[int] = None,
+        data_offset: Optional[int] = None,
+        data_size: Optional[int] = None,
+    ):
+        """
+        Args:
+            format: Container format, e.g. "wav", "flac", "ogg", "mp3"
+            duration: Duration in seconds, if known
+            sample_rate: Sample rate of the audio stream
+            channels: Number of channels
+            sample_width: Bytes per sample (PCM WAV only)
+            data_offset: Byte offset of the sample data (PCM WAV only)
+            data_size: Size of the sample data in bytes (PCM WAV only)
+        """
+        self.format = format
+        self.duration = duration
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.data_offset = data_offset
+        self.data_size = data_size
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": self.format,
+            "duration": round(self.duration, 3) if self.duration is not None else None,
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+        }
+
+
+def _skip_id3(head: bytes) -> int:
+    """Offset of the first byte after an ID3v2 tag (0 if there is none)"""
+    if len(head) < 10 or head[:3] != b"ID3":
+        return 0
+    size = (head[6] & 0x7F) << 21 | (head[7] & 0x7F) << 14 | (head[8] & 0x7F) << 7 | (head[9] & 0x7F)
+    footer = 10 if head[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _probe_wav(f: BinaryIO, head: bytes, file_size: int) -> Optional[AudioInfo]:
+    if len(head) < 12 or head[:4] not in (b"RIFF", b"RF64") or head[8:12] != b"WAVE":
+        return None
+    offset = 12
+    fmt = None
+    data_size_64 = None
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            break
+        chunk_id, chunk_size = chunk_header[:4], struct.unpack("<I", chunk_header[4:])[0]
+        body_offset = offset + 8
+        if chunk_id == b"ds64":
+            data_size_64 = struct.unpack("<Q", f.read(28)[8:16])[0]
+        elif chunk_id == b"fmt ":
+            fmt = f.read(min(chunk_size, 40))
+        elif chunk_id == b"data":
+            if fmt is None or len(fmt) < 16:
+                return None
+            format_tag, channels, sample_rate, byte_rate, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+            if data_size_64 is not None and chunk_size == 0xFFFFFFFF:
+                chunk_size = data_size_64
+            # Streamed writers leave the size at 0 or 0xFFFFFFFF; trust the file size then
+            available = file_size - body_offset
+            data_size = chunk_size if 0 < chunk_size <= available else available
+            if channels == 0 or sample_rate == 0 or byte_rate == 0:
+                return None
+            is_pcm = format_tag == 1 or (format_tag == 0xFFFE and len(fmt) >= 26 and fmt[24:26] == b"\x01\x00")
+            return AudioInfo(
+                format="wav",
+                duration=data_size / byte_rate,
+                sample_rate=sample_rate,
+                channels=channels,
+                sample_width=bits // 8 if is_pcm else None,
+                data_offset=body_offset if is_pcm else None,
+                data_size=data_size if is_pcm else None,
+            )
+        offset = body_offset + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _probe_flac(f: BinaryIO, head: bytes, file_size: int) -> Optional[AudioInfo]:
+    start = _skip_id3(head)
+    if head[start:start + 4] != b"fLaC":
+        return None
+    f.seek(start + 4)
+    block_header = f.read(4)
+    # The first metadata block is always STREAMINFO (type 0, 34 bytes)
+    if len(block_header) < 4 or block_header[0] & 0x7F != 0:
+        return None
+    info = f.read(34)
+    if len(info) < 18:
+        return None
+    packed = int.from_bytes(info[10:18], "big")
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    if sample_rate == 0:
+        return None
+    return AudioInfo(
+        format="flac",
+        duration=total_samples / sample_rate if total_samples else None,
+        sample_rate=sample_rate,
+        channels=channels,
+    )
+
+
+def _probe_ogg(f: BinaryIO, head: bytes, file_size: int) -> Optional[AudioInfo]:
+    if head[:4] != b"OggS" or len(head) < 28:
+        return None
+    segment_count = head[26]
+    packet = head[27 + segment_count:]
+    if packet[:7] == b"\x01vorbis" and len(packet) >= 16:
+        channels = packet[11]
+        sample_rate = struct.unpack("<I", packet[12:16])[0]
+        granule_rate, pre_skip, codec = sample_rate, 0, "vorbis"
+    elif packet[:8] == b"OpusHead" and len(packet) >= 16:
+        channels = packet[9]
+        pre_skip = struct.unpack("<H", packet[10:12])[0]
+        sample_rate = struct.unpack("<I", packet[12:16])[0] or 48000
+        # Opus granule positions always count 48 kHz samples
+        granule_rate, codec = 48000, "opus"
+    else:
+        return None
+
+    f.seek(max(0, file_size - TAIL_BYTES))
+    tail = f.read(TAIL_BYTES)
+    last_page = tail.rfind(b"OggS")
+    duration = None
+    if last_page != -1 and last_page + 14 <= len(tail) and granule_rate:
+        granule = struct.unpack("<q", tail[last_page + 6:last_page + 14])[0]
+        if granule > 0:
+            duration = max(0, granule - pre_skip) / granule_rate
+    return AudioInfo(format=f"ogg/{codec}", duration=duration, sample_rate=sample_rate, channels=channels)
+
+
+def _mp3_frame(header: bytes) -> Optional[Dict[str, int]]:
+    """Decode an MPEG audio frame header, or None if header is not a valid one"""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x3
+    layer = 4 - ((header[1] >> 1) & 0x3)
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 0x1
+    if layer == 1:
+        samples, length = 384, (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2 or mpeg1:
+        samples, length = 1152, 144 * bitrate // sample_rate + padding
+    else:
+        samples, length = 576, 72 * bitrate // sample_rate + padding
+    return {
+        "mpeg1": mpeg1,
+        "layer": layer,
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "channels": 1 if header[3] >> 6 == 3 else 2,
+        "samples": samples,
+        "length": length,
+    }
+
+
+def _probe_mp3(f: BinaryIO, head: bytes, file_size: int) -> Optional[AudioInfo]:
+    start = _skip_id3(head)
+    if start:
+        f.seek(start)
+        head = f.read(HEAD_BYTES)
+    else:
+        head = head[:HEAD_BYTES]
+
+    # Without an ID3 tag the first frame must be near the start of the file, and two
+    # consecutive valid frames are required so other binary data is not mistaken for MPEG audio
+    search_limit = len(head) - 4 if start else min(len(head) - 4, MP3_MAX_LEADING_BYTES)
+    position = head.find(b"\xff", 0, search_limit)
+    while position != -1:
+        frame = _mp3_frame(head[position:position + 4])
+        if frame is not None:
+            following = head[position + frame["length"]:position + frame["length"] + 4]
+            if len(following) < 4 or _mp3_frame(following) is not None:
+                break
+        position = head.find(b"\xff", position + 1, search_limit)
+    else:
+        return None
+
+    audio_start = start + position
+    duration = None
+    side_info = (32 if frame["channels"] == 2 else 17) if frame["mpeg1"] else (17 if frame["channels"] == 2 else 9)
+    xing = head[position + 4 + side_info:position + 4 + side_info + 12]
+    vbri = head[position + 36:position + 36 + 18]
+    if xing[:4] in (b"Xing", b"Info") and struct.unpack(">I", xing[4:8])[0] & 0x1:
+        frames = struct.unpack(">I", xing[8:12])[0]
+        duration = frames * frame["samples"] / frame["sample_rate"]
+    elif vbri[:4] == b"VBRI" and len(vbri) >= 18:
+        frames = struct.unpack(">I", vbri[14:18])[0]
+        duration = frames * frame["samples"] / frame["sample_rate"]
+    else:
+        audio_end = file_size
+        f.seek(max(0, file_size - 128))
+        if f.read(3) == b"TAG":
+            audio_end -= 128
+        duration = (audio_end - audio_start) * 8 / frame["bitrate"]
+    return AudioInfo(
+        format="mp3",
+        duration=duration,
+        sample_rate=frame["sample_rate"],
+        channels=frame["channels"],
+    )
+
+
+def _probe_ffprobe(file_path: str) -> Optional[AudioInfo]:
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=format_name,duration:stream=codec_type,sample_rate,channels",
+        "-of", "json",
+        file_path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        data = json.loads(result.stdout or "{}")
+    except (OSError, ValueError) as e:
+        logger.error(f"Error running ffprobe: {str(e)}")
+        return None
+    audio_streams = [s for s in data.get("streams", []) if s.get("codec_type") == "audio"]
+    if not audio_streams:
+        return None
+    stream = audio_streams[0]
+    duration = data.get("format", {}).get("duration")
+    return AudioInfo(
+        format=data.get("format", {}).get("format_name", "unknown"),
+        duration=float(duration) if duration not in (None, "N/A") else None,
+        sample_rate=int(stream["sample_rate"]) if stream.get("sample_rate") else None,
+        channels=stream.get("channels"),
+    )
+
+
+HEADER_PROBES = (_probe_wav, _probe_flac, _probe_ogg, _probe_mp3)
+
+
+def probe_audio(file_path: str, use_ffprobe: bool = True) -> Optional[AudioInfo]:
+    """
+    Read duration, sample rate and channel count of an audio file
+
+    WAV, FLAC, Ogg (Vorbis/Opus) and MP3 headers are parsed in-process;
+    other containers are handed to ffprobe.
+
+    Args:
+        file_path: Path to the audio file
+        use_ffprobe: Whether to fall back to ffprobe for unknown containers
+
+    Returns:
+        AudioInfo, or None if the file contains no readable audio stream
+    """
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            head = f.read(HEAD_BYTES)
+            for probe in HEADER_PROBES:
+                try:
+                    info = probe(f, head, file_size)
+                except (struct.error, IndexError, ValueError, ZeroDivisionError):
+                    info = None
+                if info is not None:
+                    return info
+    except OSError as e:
+        logger.error(f"Error reading audio file {file_path}: {str(e)}")
+        return None
+    return _probe_ffprobe(file_path) if use_ffprobe else None
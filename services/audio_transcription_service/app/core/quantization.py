@@ -0,0 +1,42 @@
+import logging
+import platform
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Layers whose weights are stored as int8 and whose activations are quantized on the fly
+QUANTIZABLE_LAYERS = {torch.nn.Linear, torch.nn.LSTM}
+
+
+def _select_engine() -> None:
+    """Use the quantized kernel backend that matches the CPU"""
+    supported = torch.backends.quantized.supported_engines
+    machine = platform.machine().lower()
+    preferred = ("qnnpack",) if machine in ("arm64", "aarch64") else ("x86", "fbgemm")
+    for engine in preferred:
+        if engine in supported:
+            torch.backends.quantized.engine = engine
+            return
+
+
+def quantize_dynamic_int8(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Convert Linear and LSTM layers of a model to dynamic int8 quantization
+
+    Weights are quantized once here; activations are quantized per batch at
+    inference time, so no calibration data is needed. Convolutions and
+    normalization layers stay in fp32. Quantized kernels only run on CPU.
+
+    Args:
+        model: fp32 model on CPU
+
+    Returns:
+        The same model with its Linear and LSTM layers replaced
+    """
+    _select_engine()
+    model.eval()
+    quantized = torch.ao.quantization.quantize_dynamic(model, QUANTIZABLE_LAYERS, dtype=torch.qint8, inplace=True)
+    replaced = sum(1 for module in quantized.modules() if type(module).__module__.startswith("torch.ao.nn.quantized"))
+    logger.info(f"Quantized {replaced} layers to int8 with the {torch.backends.quantized.engine} engine")
+    return quantized
@@ -0,0 +1,150 @@
+import logging
+from collections import deque
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.audio_utils import SAMPLE_RATE
+from app.core.vad import EnergyVAD, _runs
+
+logger = logging.getLogger(__name__)
+
+# (start_sample, end_sample, waveform) of audio to decode, in samples since the stream started
+Window = Tuple[int, int, np.ndarray]
+
+
+class StreamingSession:
+    """
+    Buffers a live PCM stream and decides what to decode.
+
+    Audio is appended to the open utterance. The open utterance is re-decoded
+    as a partial hypothesis; it is finalized once trailing silence longer than
+    finalize_silence_ms follows the speech, or split at its quietest frame when
+    it reaches max_utterance_seconds. Finalized audio is dropped from the buffer,
+    so memory stays bounded by the utterance length.
+    """
+
+    def __init__(
+        self,
+        vad: EnergyVAD,
+        sample_rate: int = SAMPLE_RATE,
+        finalize_silence_ms: float = 600.0,
+        max_utterance_seconds: float = 20.0,
+        partial_interval_ms: float = 300.0,
+        history_frames: int = 2000,
+        ignore_steady_noise: bool = True,
+    ):
+        """
+        Args:
+            vad: Detector used to find speech and pauses in the stream
+            sample_rate: Sample rate of the incoming PCM
+            finalize_silence_ms: Pause after speech that closes an utterance
+            max_utterance_seconds: Open utterances are force-finalized at this length
+            partial_interval_ms: Minimum new audio between two partial hypotheses
+            history_frames: Number of past frame levels used to estimate the noise floor
+            ignore_steady_noise: Until the first speech is found, treat audio without any level
+                variation as silence instead of applying the usual threshold, e.g. background
+                noise before a speaker starts
+        """
+        self.vad = vad
+        self.sample_rate = sample_rate
+        self.finalize_silence_frames = max(1, int(finalize_silence_ms / 1000 * sample_rate / vad.frame_length))
+        self.max_utterance_frames = max(1, int(max_utterance_seconds * sample_rate / vad.frame_length))
+        self.partial_interval_samples = int(partial_interval_ms / 1000 * sample_rate)
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0
+        self.total_samples = 0
+        self._remainder = b""
+        self._history: deque = deque(maxlen=history_frames)
+        self._partial_at = 0
+        self.ignore_steady_noise = ignore_steady_noise
+        self._seen_speech = False
+
+    def add_pcm(self, data: bytes) -> None:
+        """Append little-endian 16-bit mono PCM"""
+        data = self._remainder + data
+        usable = len(data) - len(data) % 2
+        self._remainder = data[usable:]
+        self.add_samples(np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0)
+
+    def add_samples(self, samples: np.ndarray) -> None:
+        """Append mono float32 samples"""
+        self.buffer = np.concatenate((self.buffer, samples))
+        self.total_samples += len(samples)
+
+    def _speech_runs(self) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+        energies = self.vad.frame_energies(self.buffer)
+        levels = np.concatenate((np.asarray(self._history, dtype=np.float32), energies))
+        if len(levels) == 0:
+            return energies, []
+        if (self.ignore_steady_noise and not self._seen_speech
+                and np.percentile(levels, 90) - np.percentile(levels, 10) < self.vad.margin_db):
+            # Steady background noise at the start of a stream is not speech; once someone has
+            # spoken, the history is mostly speech and would make continuous talk look steady
+            return energies, []
+        mask = self.vad.speech_mask(energies, self.vad.threshold(levels))
+        runs = _runs(mask)
+        self._seen_speech = self._seen_speech or bool(runs)
+        return energies, runs
+
+    def _drop(self, frames: int, energies: np.ndarray) -> None:
+        """Remove the first frames of the buffer once they have been dealt with"""
+        samples = frames * self.vad.frame_length
+        self._history.extend(energies[:frames].tolist())
+        self.buffer = self.buffer[samples:]
+        self.buffer_start += samples
+
+    def _window(self, start_frame: int, end_frame: Optional[int] = None) -> Window:
+        start = start_frame * self.vad.frame_length
+        end = len(self.buffer) if end_frame is None else end_frame * self.vad.frame_length
+        return self.buffer_start + start, self.buffer_start + end, self.buffer[start:end]
+
+    def take_final(self) -> List[Window]:
+        """Return utterances that are complete and remove them from the buffer"""
+        energies, runs = self._speech_runs()
+        n_frames = len(energies)
+        finals = []
+        consumed = 0
+        for start, end in runs:
+            if n_frames - end < self.finalize_silence_frames:
+                break
+            for piece_start, piece_end in self.vad.split_long(start, end, energies):
+                finals.append(self._window(piece_start, piece_end))
+            consumed = end
+
+        open_runs = [run for run in runs if run[0] >= consumed]
+        if open_runs and n_frames - open_runs[0][0] >= self.max_utterance_frames:
+            # Speech without a long enough pause: cut the open utterance at its quietest frame
+            start = open_runs[0][0]
+            cut = self.vad.split_long(start, start + self.max_utterance_frames + 1, energies)[0][1]
+            finals.append(self._window(start, cut))
+            consumed = cut
+        elif not open_runs and n_frames - consumed > self.finalize_silence_frames:
+            # Only silence is left: keep a short tail so the start of the next word is not lost
+            consumed = n_frames - self.finalize_silence_frames
+
+        if consumed:
+            self._drop(consumed, energies)
+        return finals
+
+    def take_partial(self) -> Optional[Window]:
+        """Return the open utterance if enough new audio arrived since the last partial"""
+        if self.total_samples - self._partial_at < self.partial_interval_samples:
+            return None
+        _, runs = self._speech_runs()
+        if not runs:
+            return None
+        self._partial_at = self.total_samples
+        return self._window(runs[0][0])
+
+    def flush(self) -> List[Window]:
+        """Finalize everything left in the buffer at the end of the stream"""
+        energies, runs = self._speech_runs()
+        finals = []
+        for start, end in runs:
+            for piece_start, piece_end in self.vad.split_long(start, end, energies):
+                # Speech running to the last frame also covers the trailing partial frame
+                finals.append(self._window(piece_start, None if piece_end == len(energies) else piece_end))
+        self.buffer_start += len(self.buffer)
+        self.buffer = np.zeros(0, dtype=np.float32)
+        return finals
@@ -0,0 +1,86 @@
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.admission import AdmissionController
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+AUTO_MODEL_TYPE = "auto"
+
+
+class ModelRouter:
+    """
+    Chooses the model for model_type=auto from the current load.
+
+    Requests go to the accurate model unless it is busy and either its
+    admission queue is deeper than max_queue_depth or its predicted latency
+    exceeds latency_target_seconds, in which case they are routed to the fast
+    model. A model with a free slot is never busy, so a slow past request
+    cannot keep traffic away from an idle accurate model. Every decision is
+    returned with its reason so it can be reported with the result.
+    """
+
+    def __init__(
+        self,
+        admission: AdmissionController,
+        is_available: Callable[[str], bool],
+        accurate_model: str = "rnnt",
+        fast_model: str = "ctc",
+        max_queue_depth: int = 2,
+        latency_target_seconds: float = 10.0,
+    ):
+        """
+        Args:
+            admission: Admission controller whose queues and service times describe the load
+            is_available: Returns whether a model type can serve requests
+            accurate_model: Model used while it meets the targets
+            fast_model: Model used under load
+            max_queue_depth: Requests waiting for the accurate model above which the fast one is used
+            latency_target_seconds: Predicted latency of the accurate model above which the fast one is used
+        """
+        self.admission = admission
+        self.is_available = is_available
+        self.accurate_model = accurate_model
+        self.fast_model = fast_model
+        self.max_queue_depth = max_queue_depth
+        self.latency_target_seconds = latency_target_seconds
+
+    def route(self, audio_seconds: Optional[float] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Pick a model for a new request
+
+        Args:
+            audio_seconds: Length of the request's audio, if already known
+
+        Returns:
+            Tuple of (model type, routing details including the reason)
+        """
+        queue_depth = self.admission.queue_depth(self.accurate_model)
+        predicted = self.admission.predicted_latency(self.accurate_model, audio_seconds)
+        if not self.is_available(self.accurate_model):
+            model_type, reason = self.fast_model, "accurate_model_unavailable"
+        elif not self.is_available(self.fast_model):
+            model_type, reason = self.accurate_model, "fast_model_unavailable"
+        elif self.admission.has_free_slot(self.accurate_model):
+            model_type, reason = self.accurate_model, "within_target"
+        elif queue_depth > self.max_queue_depth:
+            model_type, reason = self.fast_model, "queue_depth"
+        elif predicted > self.latency_target_seconds:
+            model_type, reason = self.fast_model, "predicted_latency"
+        else:
+            model_type, reason = self.accurate_model, "within_target"
+
+        metrics.counter("auto_routing_total", model_type=model_type, reason=reason).inc()
+        if model_type != self.accurate_model:
+            logger.info(
+                f"Routing auto request to {model_type} ({reason}: queue depth {queue_depth}, "
+                f"predicted latency {predicted:.1f}s)"
+            )
+        return model_type, {
+            "requested": AUTO_MODEL_TYPE,
+            "model_type": model_type,
+            "reason": reason,
+            "queue_depth": queue_depth,
+            "predicted_latency_seconds": round(predicted, 3),
+        }
@@ -0,0 +1,74 @@
+import difflib
+import string
+from typing import List, Tuple
+
+# A single matching word only counts as the overlap if it is at least this long;
+# short function words repeat too often to anchor a seam
+MIN_SINGLE_WORD_LENGTH = 5
+# Two renderings of a word that differ slightly, e.g. in an inflection, still match
+WORD_SIMILARITY = 0.8
+# Shorter words are only matched exactly
+MIN_FRAGMENT_LENGTH = 4
+
+_STRIP = string.punctuation + "«»—…"
+
+
+def _normalize(word: str) -> str:
+    return word.strip(_STRIP).lower().replace("ё", "е")
+
+
+def _matches(a: str, b: str, a_is_last: bool, b_is_first: bool) -> bool:
+    """Whether two normalized words are renderings of the same spoken word"""
+    if a == b:
+        return bool(a)
+    if min(len(a), len(b)) < MIN_FRAGMENT_LENGTH:
+        return False
+    # Only the outermost words can be cut by a window edge
+    if (a_is_last and b.startswith(a)) or (b_is_first and a.endswith(b)):
+        return True
+    return difflib.SequenceMatcher(None, a, b).ratio() >= WORD_SIMILARITY
+
+
+def reconcile_seam(
+    previous: List[str],
+    following: List[str],
+    max_overlap_words: int,
+) -> Tuple[List[str], List[str]]:
+    """
+    Remove the words two overlapping windows both transcribed
+
+    The longest run of matching words between the end of the previous window's
+    text and the start of the following window's text is taken as the audio
+    the windows share. Words of the previous window after that run and words
+    of the following window before it lie at a window edge, where a word may
+    be cut, so they are dropped in favour of the other window's copy. Of each
+    matched pair the longer rendering is kept, as a cut word is the shorter.
+
+    Args:
+        previous: Words of the earlier window
+        following: Words of the later window
+        max_overlap_words: How many words at each edge are searched
+
+    Returns:
+        The words to keep of each window (with the shared ones in the first);
+        both unchanged if no shared words were found
+    """
+    tail = [_normalize(word) for word in previous[-max_overlap_words:]]
+    head = [_normalize(word) for word in following[:max_overlap_words]]
+    best_size, best_i, best_j = 0, 0, 0
+    for i in range(len(tail)):
+        for j in range(len(head)):
+            size = 0
+            while (i + size < len(tail) and j + size < len(head)
+                   and _matches(tail[i + size], head[j + size], i + size == len(tail) - 1, j + size == 0)):
+                size += 1
+            if size > best_size:
+                best_size, best_i, best_j = size, i, j
+    if best_size == 0 or (best_size == 1 and len(tail[best_i]) < MIN_SINGLE_WORD_LENGTH):
+        return previous, following
+    start = len(previous) - len(tail) + best_i
+    shared = [
+        max(previous[start + k], following[best_j + k], key=len)
+        for k in range(best_size)
+    ]
+    return previous[:start] + shared, following[best_j + best_size:]
@@ -0,0 +1,148 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+from app.core.audio_utils import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# (start_sample, end_sample, speaker label or None) of a speech region
+SpeakerRegion = Tuple[int, int, Optional[str]]
+
+# Voice activity detection settings of GigaAM's transcribe_longform: keep every speech and pause frame
+VAD_PARAMETERS = {"min_duration_on": 0.0, "min_duration_off": 0.0}
+
+
+class PyannoteSegmenter:
+    """
+    pyannote pipelines used for long-form segmentation, loaded once per process.
+
+    Voice activity detection only finds speech; it runs a segmentation model
+    with the same settings as GigaAM's transcribe_longform. The diarization
+    pipeline also labels who is speaking. Each is loaded on first use (or by load())
+    and then shared by all requests, which run it on decoded waveforms, so a
+    request pays neither for building the pipeline nor for writing audio
+    files for it to read.
+    """
+
+    def __init__(self, segmentation_model: str, diarization_model: str, hf_token: Optional[str], device: str = "cpu"):
+        """
+        Args:
+            segmentation_model: Hugging Face id of the segmentation model used for voice activity detection
+            diarization_model: Hugging Face id of the speaker diarization pipeline
+            hf_token: Token with access to both (pyannote models are gated)
+            device: Torch device the pipelines run on
+        """
+        self.segmentation_model = segmentation_model
+        self.diarization_model = diarization_model
+        self.hf_token = hf_token
+        self.device = device
+        self._pipelines: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def load(self, diarization: bool = False) -> Any:
+        """
+        Return a pipeline, loading it on first use
+
+        Raises:
+            ImportError: If pyannote.audio is not installed
+            RuntimeError: If the pipeline could not be downloaded
+        """
+        name = self.diarization_model if diarization else self.segmentation_model
+        with self._lock:
+            pipeline = self._pipelines.get(name)
+            if pipeline is None:
+                logger.info(f"Loading pyannote pipeline {name}...")
+                pipeline = self._diarization_pipeline(name) if diarization else self._vad_pipeline(name)
+                pipeline.to(torch.device(self.device))
+                self._pipelines[name] = pipeline
+                logger.info(f"Loaded pyannote pipeline {name}")
+        return pipeline
+
+    def _vad_pipeline(self, name: str) -> Any:
+        from pyannote.audio import Model
+        from pyannote.audio.pipelines import VoiceActivityDetection
+
+        model = Model.from_pretrained(name, use_auth_token=self.hf_token)
+        if model is None:
+            raise RuntimeError(f"Could not load pyannote model {name}; check HF_TOKEN and the model's access conditions")
+        pipeline = VoiceActivityDetection(segmentation=model)
+        pipeline.instantiate(VAD_PARAMETERS)
+        return pipeline
+
+    def _diarization_pipeline(self, name: str) -> Any:
+        from pyannote.audio import Pipeline
+
+        pipeline = Pipeline.from_pretrained(name, use_auth_token=self.hf_token)
+        if pipeline is None:
+            raise RuntimeError(f"Could not load pyannote pipeline {name}; check HF_TOKEN and the model's access conditions")
+        return pipeline
+
+    def regions(self, wav: np.ndarray, diarization: bool = False, sample_rate: int = SAMPLE_RATE) -> List[SpeakerRegion]:
+        """
+        Find the speech in a waveform
+
+        Args:
+            wav: Mono float32 waveform
+            diarization: Whether to label regions with speakers
+            sample_rate: Sample rate of wav
+
+        Returns:
+            Non-overlapping speech regions in time order; overlapping speech is
+            attributed to the speaker who started first
+        """
+        pipeline = self.load(diarization)
+        annotation = pipeline({"waveform": torch.from_numpy(wav).unsqueeze(0), "sample_rate": sample_rate})
+        if not diarization:
+            return [
+                (int(segment.start * sample_rate), min(int(segment.end * sample_rate), len(wav)), None)
+                for segment in annotation.get_timeline().support()
+            ]
+        turns = sorted(
+            (turn.start, turn.end, str(speaker))
+            for turn, _, speaker in annotation.itertracks(yield_label=True)
+        )
+        regions: List[SpeakerRegion] = []
+        covered = 0
+        for start, end, speaker in turns:
+            start, end = max(int(start * sample_rate), covered), min(int(end * sample_rate), len(wav))
+            if end > start:
+                regions.append((start, end, speaker))
+                covered = end
+        return regions
+
+
+def group_regions(regions: List[SpeakerRegion], max_samples: int, min_samples: int = 0) -> List[SpeakerRegion]:
+    """
+    Join consecutive speech regions of one speaker into chunks the model can transcribe
+
+    As in GigaAM's transcribe_longform, regions are added to a chunk until it
+    is longer than min_samples or the next region would take it past
+    max_samples. Pauses between joined regions stay in the chunk. A region
+    longer than max_samples is split into equal parts.
+
+    Args:
+        regions: Speech regions in time order
+        max_samples: Maximum chunk length
+        min_samples: A chunk at least this long is not extended
+
+    Returns:
+        Chunks in time order
+    """
+    chunks: List[SpeakerRegion] = []
+    for start, end, speaker in regions:
+        if end <= start:
+            continue
+        parts = -(-(end - start) // max_samples)
+        step = -(-(end - start) // parts)
+        for part_start in range(start, end, step):
+            part_end = min(part_start + step, end)
+            if (chunks and chunks[-1][2] == speaker and part_end - chunks[-1][0] <= max_samples
+                    and chunks[-1][1] - chunks[-1][0] <= min_samples):
+                chunks[-1] = (chunks[-1][0], part_end, speaker)
+            else:
+                chunks.append((part_start, part_end, speaker))
+    return chunks
@@ -0,0 +1,129 @@
+import json
+import logging
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.database import ProcessLocalDatabase
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcriptions (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    filename TEXT,
+    model_type TEXT NOT NULL,
+    long_form INTEGER NOT NULL,
+    duration REAL,
+    transcription TEXT NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcriptions_created_at ON transcriptions (created_at);
+CREATE INDEX IF NOT EXISTS transcriptions_model_created_at ON transcriptions (model_type, created_at);
+"""
+
+# Characters of the transcription included in list entries
+PREVIEW_LENGTH = 200
+
+
+class TranscriptionStore:
+    """
+    SQLite store of finished transcriptions, retrievable by id.
+
+    The full result (utterances, model, timing) is kept as JSON, while the
+    columns used for listing are stored separately and indexed by creation
+    time, so listing never parses the stored results.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: SQLite database file, created if missing
+        """
+        self._db = ProcessLocalDatabase(db_path, SCHEMA)
+
+    def save(self, result: Dict[str, Any], long_form: bool, transcript_id: Optional[str] = None) -> str:
+        """
+        Store a transcription result
+
+        Args:
+            result: Response body of the transcription
+            long_form: Whether the long-form mode was used
+            transcript_id: Id to store it under (a new one is generated if omitted)
+
+        Returns:
+            The id of the stored transcription
+        """
+        transcript_id = transcript_id or str(uuid.uuid4())
+        file_info = result.get("file_info") or {}
+        with self._db.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO transcriptions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    transcript_id,
+                    time.time(),
+                    file_info.get("filename"),
+                    result.get("model_type", ""),
+                    int(long_form),
+                    result.get("duration"),
+                    result.get("transcription", ""),
+                    json.dumps(result, ensure_ascii=False),
+                )
+            )
+        return transcript_id
+
+    def get(self, transcript_id: str) -> Optional[Dict[str, Any]]:
+        """Return the stored result with its id and creation time, or None"""
+        with self._db.connection() as conn:
+            row = conn.execute(
+                "SELECT result, created_at FROM transcriptions WHERE id = ?", (transcript_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        result = json.loads(row[0])
+        result["id"] = transcript_id
+        result["created_at"] = row[1]
+        return result
+
+    def list(self, limit: int = 20, offset: int = 0, model_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Page through stored transcriptions, newest first
+
+        Args:
+            limit: Maximum number of entries to return
+            offset: Number of entries to skip
+            model_type: Only list transcriptions made with this model
+
+        Returns:
+            Dict with the page of entries (without utterances) and the total count
+        """
+        where, params = ("WHERE model_type = ?", [model_type]) if model_type else ("", [])
+        with self._db.connection() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM transcriptions {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT id, created_at, filename, model_type, long_form, duration, substr(transcription, 1, ?) "
+                f"FROM transcriptions {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                [PREVIEW_LENGTH] + params + [limit, offset]
+            ).fetchall()
+        return {
+            "items": [
+                {
+                    "id": transcript_id,
+                    "created_at": created_at,
+                    "filename": filename,
+                    "model_type": row_model_type,
+                    "long_form": bool(long_form),
+                    "duration": duration,
+                    "preview": preview,
+                }
+                for transcript_id, created_at, filename, row_model_type, long_form, duration, preview in rows
+            ],
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+        }
+
+    def close(self) -> None:
+        self._db.close()
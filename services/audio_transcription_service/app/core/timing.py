@@ -0,0 +1,89 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from app.core.metrics import metrics
+
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0)
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+
+_current: contextvars.ContextVar[Optional["StageTimings"]] = contextvars.ContextVar("stage_timings", default=None)
+
+
+class StageTimings:
+    """
+    Wall-clock time spent in each processing stage of one request.
+
+    Time is summed per stage, so stages that run concurrently (long-form
+    batches decoded in parallel, segmentation overlapping inference) can add
+    up to more than the total.
+    """
+
+    def __init__(self, report: bool = False):
+        """
+        Args:
+            report: Whether the timings are returned to the client, not only exported as metrics
+        """
+        self.report = report
+        self.stages: Dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def activate(self) -> contextvars.Token:
+        """Make these the timings of the current task and of every task and thread it starts"""
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token: contextvars.Token) -> None:
+        _current.reset(token)
+
+    def to_dict(self, audio_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Args:
+            audio_seconds: Duration of the input, used for the real-time factor
+
+        Returns:
+            Seconds per stage, total seconds and the real-time factor (total / audio duration)
+        """
+        total = time.perf_counter() - self.started
+        return {
+            "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            "total_seconds": round(total, 4),
+            "audio_seconds": round(audio_seconds, 3) if audio_seconds else None,
+            "rtf": round(total / audio_seconds, 4) if audio_seconds else None,
+        }
+
+    def observe(self, model_type: str, audio_seconds: Optional[float] = None) -> None:
+        """Export the stage times and real-time factor as histograms labelled by model type"""
+        for name, seconds in self.stages.items():
+            metrics.histogram("stage_seconds", buckets=STAGE_BUCKETS, model_type=model_type, stage=name).observe(seconds)
+        total = time.perf_counter() - self.started
+        metrics.histogram("request_seconds", buckets=STAGE_BUCKETS, model_type=model_type).observe(total)
+        if audio_seconds:
+            metrics.histogram("real_time_factor", buckets=RTF_BUCKETS, model_type=model_type).observe(total / audio_seconds)
+
+
+def current_timings() -> Optional[StageTimings]:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a stage of the request being processed, if it is being timed"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    with timings.stage(name):
+        yield
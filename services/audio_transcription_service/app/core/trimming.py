@@ -0,0 +1,124 @@
+import bisect
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+from app.core.audio_utils import SAMPLE_RATE
+from app.core.metrics import metrics
+from app.core.vad import EnergyVAD, Region
+
+logger = logging.getLogger(__name__)
+
+SILENCE_RATIO_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+class TimestampMap:
+    """
+    Maps times in silence-trimmed audio back to the original recording.
+
+    The trimmed audio is the concatenation of the kept regions, so a time in
+    it falls into exactly one region and is shifted by the silence removed
+    before that region.
+    """
+
+    def __init__(self, regions: List[Region], total_samples: int, sample_rate: int = SAMPLE_RATE):
+        """
+        Args:
+            regions: Kept (start_sample, end_sample) regions of the original audio, in order
+            total_samples: Length of the original audio
+            sample_rate: Sample rate of both waveforms
+        """
+        self.regions = regions
+        self.total_samples = total_samples
+        self.sample_rate = sample_rate
+        self._offsets = []
+        kept = 0
+        for start, end in regions:
+            self._offsets.append(kept)
+            kept += end - start
+        self.kept_samples = kept
+
+    @classmethod
+    def identity(cls, total_samples: int, sample_rate: int = SAMPLE_RATE) -> "TimestampMap":
+        return cls([(0, total_samples)] if total_samples else [], total_samples, sample_rate)
+
+    @property
+    def removed_seconds(self) -> float:
+        return (self.total_samples - self.kept_samples) / self.sample_rate
+
+    @property
+    def silence_ratio(self) -> float:
+        return 1.0 - self.kept_samples / self.total_samples if self.total_samples else 0.0
+
+    def to_original(self, seconds: float, is_end: bool = False) -> float:
+        """
+        Convert a time in the trimmed audio to the original recording
+
+        Args:
+            seconds: Time in the trimmed audio
+            is_end: Whether the time ends an interval; a time exactly on a cut then
+                maps to the end of the earlier region instead of the start of the next
+
+        Returns:
+            Time in the original audio, in seconds
+        """
+        if not self.regions:
+            return seconds
+        position = seconds * self.sample_rate
+        search = bisect.bisect_left if is_end else bisect.bisect_right
+        index = min(max(search(self._offsets, position) - 1, 0), len(self.regions) - 1)
+        start, end = self.regions[index]
+        original = min(start + position - self._offsets[index], end)
+        return round(original / self.sample_rate, 3)
+
+    def map_boundaries(self, start: float, end: float) -> List[float]:
+        return [self.to_original(start), self.to_original(end, is_end=True)]
+
+
+def trim_silence(
+    wav: np.ndarray,
+    vad: EnergyVAD,
+    min_removed_seconds: float = 1.0,
+    sample_rate: int = SAMPLE_RATE,
+) -> Tuple[np.ndarray, TimestampMap]:
+    """
+    Drop non-speech regions from a waveform before inference
+
+    Speech regions found by the VAD keep their padding, so every cut leaves a
+    short stretch of the original pause between two utterances.
+
+    Args:
+        wav: Mono float32 waveform
+        vad: Detector used to find speech
+        min_removed_seconds: Audio is left untouched unless at least this much silence can be removed
+        sample_rate: Sample rate of wav
+
+    Returns:
+        Tuple of (trimmed waveform, map from trimmed to original time)
+    """
+    regions = _merge_adjacent(vad.segment(wav))
+    removed = (len(wav) - sum(end - start for start, end in regions)) / sample_rate
+    if removed < min_removed_seconds:
+        return wav, TimestampMap.identity(len(wav), sample_rate)
+
+    timestamps = TimestampMap(regions, len(wav), sample_rate)
+    metrics.histogram("trimmed_silence_ratio", buckets=SILENCE_RATIO_BUCKETS).observe(timestamps.silence_ratio)
+    logger.info(
+        f"Trimmed {timestamps.removed_seconds:.1f}s of silence from {len(wav) / sample_rate:.1f}s of audio "
+        f"({len(regions)} speech regions)"
+    )
+    if not regions:
+        return np.zeros(0, dtype=np.float32), timestamps
+    return np.concatenate([wav[start:end] for start, end in regions]), timestamps
+
+
+def _merge_adjacent(regions: List[Region]) -> List[Region]:
+    """Join regions that touch, e.g. pieces of one long utterance split by the VAD"""
+    merged: List[List[int]] = []
+    for start, end in regions:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
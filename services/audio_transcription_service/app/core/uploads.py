@@ -0,0 +1,227 @@
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import tarfile
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured size limit."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"File is too large. Maximum size is {max_bytes // (1024 * 1024)} MB")
+
+
+class EmptyUpload(Exception):
+    """Raised when an upload contains no data."""
+
+    def __init__(self):
+        super().__init__("File is empty")
+
+
+class SpooledUpload:
+    """An upload that has been written to a spool file on disk."""
+
+    def __init__(self, path: str, size: int, sha256: str, filename: Optional[str], content_type: Optional[str]):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.filename = filename
+        self.content_type = content_type
+        # Header information (AudioInfo) filled in once the spooled file has been probed
+        self.audio_info: Any = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Probed length of the audio in seconds, if known"""
+        return self.audio_info.duration if self.audio_info is not None else None
+
+    @property
+    def file_info(self) -> Dict[str, Any]:
+        return {
+            "filename": self.filename,
+            "size": self.size,
+            "content_type": self.content_type
+        }
+
+    def cleanup(self) -> None:
+        """Delete the spool file"""
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+                logger.info(f"Removed spooled upload: {self.path}")
+        except Exception as e:
+            logger.error(f"Error cleaning up file {self.path}: {str(e)}")
+
+
+def _copy_to_spool(source: BinaryIO, path: str, max_bytes: int, chunk_size: int):
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "wb") as out:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                out.write(chunk)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return size, digest.hexdigest()
+
+
+async def spool_upload(
+    upload: UploadFile,
+    spool_dir: Path,
+    max_bytes: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> SpooledUpload:
+    """
+    Stream an upload to a spool file in fixed-size chunks, hashing it on the way
+
+    Memory use is bounded by chunk_size regardless of the upload size.
+
+    Args:
+        upload: Incoming multipart file
+        spool_dir: Directory for spool files
+        max_bytes: Maximum accepted size in bytes (0 disables the limit)
+        chunk_size: Read/write chunk size in bytes
+
+    Returns:
+        The spooled upload
+
+    Raises:
+        UploadTooLarge: If the upload exceeds max_bytes
+        EmptyUpload: If the upload contains no data
+    """
+    # Reject early when the multipart parser already knows the size
+    if max_bytes and upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+    extension = os.path.splitext(upload.filename or "")[1] or ".wav"
+    path = str(spool_dir / f"{uuid.uuid4().hex}{extension}")
+    await upload.seek(0)
+    size, sha256 = await asyncio.to_thread(_copy_to_spool, upload.file, path, max_bytes, chunk_size)
+    if size == 0:
+        os.remove(path)
+        raise EmptyUpload()
+
+    logger.info(f"Spooled {size} bytes to {path}")
+    return SpooledUpload(path, size, sha256, upload.filename, upload.content_type)
+
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+class InvalidArchive(Exception):
+    """Raised when an uploaded archive cannot be read or exceeds the batch limits."""
+
+
+def is_archive(filename: Optional[str]) -> bool:
+    return bool(filename) and filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def _member_name(name: str) -> Optional[str]:
+    """Normalized archive member name, or None for entries that should be skipped"""
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts or parts[0] == "__MACOSX" or parts[-1].startswith("."):
+        return None
+    return "/".join(parts)
+
+
+def _iter_archive_members(path: str):
+    """Yield (member name, readable file object) for every regular file in a zip or tar archive"""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    with archive.open(info) as source:
+                        yield info.filename, source
+    else:
+        with tarfile.open(path, "r:*") as archive:
+            for member in archive:
+                # Links, devices and directories are never extracted
+                if member.isfile():
+                    source = archive.extractfile(member)
+                    if source is not None:
+                        with source:
+                            yield member.name, source
+
+
+def extract_archive(
+    upload: SpooledUpload,
+    spool_dir: Path,
+    max_files: int,
+    max_bytes: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[SpooledUpload]:
+    """
+    Spool every file of a zip or tar archive as a separate upload
+
+    Members are written to spool files with random names, so member paths are
+    never used on disk. Hidden files, directories and links are skipped.
+
+    Args:
+        upload: Spooled archive
+        spool_dir: Directory for spool files
+        max_files: Maximum number of files accepted from the archive
+        max_bytes: Maximum total uncompressed size in bytes (0 disables the limit)
+        chunk_size: Read/write chunk size in bytes
+
+    Returns:
+        One SpooledUpload per archive member, in archive order
+
+    Raises:
+        InvalidArchive: If the archive is corrupt or exceeds max_files
+        UploadTooLarge: If the uncompressed contents exceed max_bytes
+    """
+    members: List[SpooledUpload] = []
+    total = 0
+    try:
+        for raw_name, source in _iter_archive_members(upload.path):
+            name = _member_name(raw_name)
+            if name is None:
+                logger.info(f"Skipping archive member {raw_name!r} of {upload.filename}")
+                continue
+            if len(members) >= max_files:
+                raise InvalidArchive(f"Archive {upload.filename} contains more than {max_files} files")
+            extension = os.path.splitext(name)[1]
+            path = str(spool_dir / f"{uuid.uuid4().hex}{extension}")
+            remaining = max_bytes - total if max_bytes else 0
+            if max_bytes and remaining <= 0:
+                raise UploadTooLarge(max_bytes)
+            try:
+                size, sha256 = _copy_to_spool(source, path, remaining, chunk_size)
+            except UploadTooLarge:
+                # Report the total limit rather than what was left of it
+                raise UploadTooLarge(max_bytes)
+            total += size
+            members.append(SpooledUpload(path, size, sha256, name, mimetypes.guess_type(name)[0]))
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as e:
+        for member in members:
+            member.cleanup()
+        raise InvalidArchive(f"Cannot read archive {upload.filename}: {str(e)}") from e
+    except Exception:
+        for member in members:
+            member.cleanup()
+        raise
+
+    logger.info(f"Extracted {len(members)} files ({total} bytes) from {upload.filename}")
+    return members
@@ -0,0 +1,156 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.audio_utils import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# (start_sample, end_sample) of a speech region
+Region = Tuple[int, int]
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """Return [start, end) index pairs of consecutive True values"""
+    if not mask.any():
+        return []
+    padded = np.concatenate(([False], mask, [False]))
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(changes[::2].tolist(), changes[1::2].tolist()))
+
+
+class EnergyVAD:
+    """
+    Energy-based voice activity detector and utterance segmenter.
+
+    Frames whose RMS level is sufficiently above the estimated noise floor are
+    treated as speech. Short pauses are bridged, short blips are dropped, and
+    regions longer than max_segment_seconds are split at their quietest frame
+    so each segment fits the short-form model limit.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: float = 30.0,
+        margin_db: float = 10.0,
+        silence_floor_db: float = -60.0,
+        min_speech_ms: float = 250.0,
+        min_silence_ms: float = 400.0,
+        pad_ms: float = 200.0,
+        max_segment_seconds: float = 20.0,
+    ):
+        """
+        Args:
+            sample_rate: Sample rate of the input waveforms
+            frame_ms: Analysis frame length
+            margin_db: How far above the noise floor a frame must be to count as speech
+            silence_floor_db: Frames below this level (dBFS) are always silence
+            min_speech_ms: Speech regions shorter than this are dropped
+            min_silence_ms: Pauses shorter than this do not split speech regions
+            pad_ms: Padding added around every speech region
+            max_segment_seconds: Longer regions are split at their quietest frame
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = max(1, int(sample_rate * frame_ms / 1000))
+        self.margin_db = margin_db
+        self.silence_floor_db = silence_floor_db
+        self.min_speech_frames = max(1, int(round(min_speech_ms / frame_ms)))
+        self.min_silence_frames = max(1, int(round(min_silence_ms / frame_ms)))
+        self.pad_frames = int(round(pad_ms / frame_ms))
+        self.max_segment_frames = max(1, int(max_segment_seconds * 1000 / frame_ms))
+
+    def settings(self) -> Dict[str, Any]:
+        """Parameters that determine the detected regions, e.g. for cache keys"""
+        return {
+            "sample_rate": self.sample_rate,
+            "frame_length": self.frame_length,
+            "margin_db": self.margin_db,
+            "silence_floor_db": self.silence_floor_db,
+            "min_speech_frames": self.min_speech_frames,
+            "min_silence_frames": self.min_silence_frames,
+            "pad_frames": self.pad_frames,
+            "max_segment_frames": self.max_segment_frames,
+        }
+
+    def frame_energies(self, wav: np.ndarray) -> np.ndarray:
+        """RMS level of each frame in dBFS"""
+        n_frames = len(wav) // self.frame_length
+        if n_frames == 0:
+            return np.zeros(0, dtype=np.float32)
+        frames = wav[:n_frames * self.frame_length].reshape(n_frames, self.frame_length)
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+        return 20.0 * np.log10(rms + 1e-10)
+
+    def threshold(self, energies: np.ndarray) -> float:
+        """
+        Speech threshold derived from the noise floor of the recording
+
+        The loud level is taken from the top percent of frames, so speech is
+        still found when it fills only a few percent of a recording. Without
+        a spread of at least margin_db between the two levels nothing stands
+        out from the noise and no frame counts as speech.
+        """
+        audible = energies[energies > self.silence_floor_db]
+        if len(audible) == 0:
+            return float("inf")
+        floor = float(np.percentile(audible, 10))
+        loud = float(np.percentile(audible, 99))
+        if loud - floor < self.margin_db:
+            return float("inf")
+        # Keep the threshold below typical speech level even when there is almost no silence
+        return max(min(floor + self.margin_db, (floor + loud) / 2), self.silence_floor_db)
+
+    def speech_mask(self, energies: np.ndarray, threshold: Optional[float] = None) -> np.ndarray:
+        """Per-frame speech decision after bridging pauses and dropping blips"""
+        if threshold is None:
+            threshold = self.threshold(energies)
+        mask = energies > threshold
+        runs = _runs(mask)
+
+        merged: List[List[int]] = []
+        for start, end in runs:
+            if merged and start - merged[-1][1] < self.min_silence_frames:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+
+        result = np.zeros_like(mask)
+        for start, end in merged:
+            if end - start >= self.min_speech_frames:
+                result[max(0, start - self.pad_frames):min(len(mask), end + self.pad_frames)] = True
+        return result
+
+    def split_long(self, start: int, end: int, energies: np.ndarray) -> List[Tuple[int, int]]:
+        """Split a frame range into pieces of at most max_segment_frames"""
+        pieces = []
+        while end - start > self.max_segment_frames:
+            search_from = start + self.max_segment_frames // 2
+            search_to = start + self.max_segment_frames
+            cut = search_from + int(np.argmin(energies[search_from:search_to]))
+            pieces.append((start, cut))
+            start = cut
+        pieces.append((start, end))
+        return pieces
+
+    def segment(self, wav: np.ndarray, threshold: Optional[float] = None) -> List[Region]:
+        """
+        Split a waveform into speech segments
+
+        Args:
+            wav: Mono float32 waveform
+            threshold: Fixed speech threshold in dBFS (estimated from wav if omitted)
+
+        Returns:
+            (start_sample, end_sample) of every speech segment, in order
+        """
+        energies = self.frame_energies(wav)
+        mask = self.speech_mask(energies, threshold)
+        regions = []
+        for start, end in _runs(mask):
+            for piece_start, piece_end in self.split_long(start, end, energies):
+                # Speech running to the last frame also covers the trailing partial frame
+                end_sample = len(wav) if piece_end == len(energies) else piece_end * self.frame_length
+                regions.append((piece_start * self.frame_length, end_sample))
+        return regions
@@ -0,0 +1,106 @@
+import logging
+from typing import Iterator
+
+import numpy as np
+
+from app.core.audio_utils import SAMPLE_RATE, iter_audio_windows
+from app.core.realtime import StreamingSession, Window
+from app.core.vad import EnergyVAD
+
+logger = logging.getLogger(__name__)
+
+
+def iter_speech_segments(
+    file_path: str,
+    vad: EnergyVAD,
+    window_seconds: float = 60.0,
+    history_seconds: float = 60.0,
+    sample_rate: int = SAMPLE_RATE,
+) -> Iterator[Window]:
+    """
+    Split a recording of any length into speech segments, one window at a time
+
+    Windows are fed to a StreamingSession with the VAD's own pause and length
+    limits. An utterance still open at the end of a window is carried over and
+    completed with the next one, so no segment is cut at a window edge, and
+    peak memory is one window plus at most one unfinished segment. The noise
+    floor is estimated over the last history_seconds instead of the whole file.
+
+    Args:
+        file_path: Path to the input file
+        vad: Detector used to find speech
+        window_seconds: Length of audio decoded at a time
+        history_seconds: Past audio used to estimate the noise floor
+        sample_rate: Target sample rate
+
+    Yields:
+        (start_sample, end_sample, waveform) of every speech segment, in order
+    """
+    frame_seconds = vad.frame_length / sample_rate
+    session = StreamingSession(
+        vad,
+        sample_rate=sample_rate,
+        finalize_silence_ms=vad.min_silence_frames * frame_seconds * 1000,
+        max_utterance_seconds=vad.max_segment_frames * frame_seconds,
+        history_frames=max(1, int(history_seconds / frame_seconds)),
+        # Same decision as the whole-file VAD, which has no notion of a stream start
+        ignore_steady_noise=False,
+    )
+    count = 0
+    for window in iter_audio_windows(file_path, max(1, int(window_seconds * sample_rate)), sample_rate):
+        session.add_samples(window)
+        while True:
+            # One call force-splits at most one over-long utterance, so drain until nothing is complete
+            finals = session.take_final()
+            if not finals:
+                break
+            count += len(finals)
+            for start, end, wav in finals:
+                # Copy so a pending segment does not keep the whole window alive
+                yield start, end, wav.copy()
+    finals = session.flush()
+    count += len(finals)
+    yield from finals
+    logger.info(f"VAD found {count} speech segments in {session.total_samples / sample_rate:.1f}s of audio")
+
+
+def iter_fixed_windows(
+    file_path: str,
+    window_seconds: float = 20.0,
+    overlap_seconds: float = 3.0,
+    sample_rate: int = SAMPLE_RATE,
+) -> Iterator[Window]:
+    """
+    Split a recording of any length into fixed-length, overlapping windows
+
+    Window boundaries depend only on the sample count, so the same file is
+    always split the same way. Each window starts overlap_seconds before the
+    previous one ends; the last window holds whatever audio is left.
+
+    Args:
+        file_path: Path to the input file
+        window_seconds: Length of every window but the last
+        overlap_seconds: Audio shared by consecutive windows
+        sample_rate: Target sample rate
+
+    Yields:
+        (start_sample, end_sample, waveform) of every window, in order
+    """
+    window = max(1, int(window_seconds * sample_rate))
+    overlap = min(max(0, int(overlap_seconds * sample_rate)), window - 1)
+    hop = window - overlap
+    buffer = np.zeros(0, dtype=np.float32)
+    start = 0
+    count = 0
+    for block in iter_audio_windows(file_path, hop, sample_rate):
+        buffer = np.concatenate([buffer, block])
+        if len(buffer) >= window:
+            count += 1
+            yield start, start + window, buffer[:window].copy()
+            buffer = buffer[hop:]
+            start += hop
+    # After a full window the buffer starts with audio that window already covered
+    if len(buffer) > (overlap if count else 0):
+        count += 1
+        yield start, start + len(buffer), buffer
+    logger.info(f"Split {(start + len(buffer)) / sample_rate:.1f}s of audio into {count} overlapping windows")
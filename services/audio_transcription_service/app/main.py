@@ -1,18 +1,45 @@
 import os
+import json
+import asyncio
+import functools
 import shutil
-import tempfile
+import time
 import logging
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Form
+from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Form, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, AsyncIterator, Awaitable, Callable, Deque, Iterator, Set, Tuple
+from collections import deque
 import uuid
 import gigaam
 import whisperx
 import torch
+import numpy as np
 from pathlib import Path
 import datetime
+from app.core.jobs import JobManager, JobQueueFull, JOB_PROCESSING, JOB_COMPLETED, JOB_FAILED
+from app.core.inference import InferenceExecutor
+from app.core.batching import MicroBatcher, transcribe_batch, transcribe_waveform, SAMPLE_RATE, SHORTFORM_MAX_SECONDS
+from app.core.audio_utils import decode_audio
+from app.core.probe import probe_audio
+from app.core.metrics import metrics
+from app.core.uploads import spool_upload, SpooledUpload, UploadTooLarge, EmptyUpload, InvalidArchive, is_archive, extract_archive
+from app.core.cache import TranscriptionCache
+from app.core.checkpoints import CheckpointStore
+from app.core.store import TranscriptionStore
+from app.core.admission import AdmissionController, AdmissionRejected, AdmissionTicket
+from app.core.routing import ModelRouter, AUTO_MODEL_TYPE
+from app.core.timing import StageTimings, current_timings, stage
+from app.core.model_manager import ModelManager, ModelUnavailable
+from app.core.alignment import AlignmentModelCache
+from app.core.quantization import quantize_dynamic_int8
+from app.core.vad import EnergyVAD
+from app.core.realtime import StreamingSession, Window
+from app.core.windowing import iter_fixed_windows, iter_speech_segments
+from app.core.segmentation import PyannoteSegmenter, group_regions
+from app.core.seams import reconcile_seam
+from app.core.trimming import TimestampMap, trim_silence
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -31,108 +58,312 @@ app.add_middleware(
 )
 
 # Create uploads directory if it doesn't exist
-UPLOAD_DIR = Path("/app/uploads")
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "/app/uploads"))
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+SPOOL_DIR = UPLOAD_DIR / "spool"
+SPOOL_DIR.mkdir(parents=True, exist_ok=True)
 
-# Initialize models
+# Upload limits: files are streamed to SPOOL_DIR in chunks, never read whole into memory
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "2048")) * 1024 * 1024)
+MAX_REQUEST_BYTES = int(float(os.getenv("MAX_REQUEST_MB", os.getenv("MAX_UPLOAD_MB", "2048"))) * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_KB", "1024")) * 1024
+
+@app.middleware("http")
+async def reject_oversized_requests(request: Request, call_next):
+    """Reject uploads whose declared size is over the limit before the body is read"""
+    content_length = request.headers.get("content-length")
+    if MAX_REQUEST_BYTES and content_length and content_length.isdigit() and int(content_length) > MAX_REQUEST_BYTES:
+        return JSONResponse(
+            status_code=413,
+            content={"error": f"Request is too large. Maximum size is {MAX_REQUEST_BYTES // (1024 * 1024)} MB"}
+        )
+    return await call_next(request)
+
+# Transcription job queue configuration
+TRANSCRIPTION_WORKERS = int(os.getenv("TRANSCRIPTION_WORKERS", "2"))
+TRANSCRIPTION_QUEUE_SIZE = int(os.getenv("TRANSCRIPTION_QUEUE_SIZE", "100"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+
+job_manager = JobManager(
+    worker_count=TRANSCRIPTION_WORKERS,
+    max_queue_size=TRANSCRIPTION_QUEUE_SIZE,
+    retention_seconds=JOB_RETENTION_SECONDS
+)
+
+# Transcriptions that outlive their request, e.g. a stream whose client disconnected; the
+# event loop only keeps weak references to tasks, so they are held here until they finish
+background_tasks: Set[asyncio.Task] = set()
+
+# Identifies this server start; worker processes forked by app.serve share it
+SERVER_INSTANCE_ID = uuid.uuid4().hex
+# How often a job queued by another worker process is polled for its stream
+SHARED_JOB_POLL_SECONDS = float(os.getenv("SHARED_JOB_POLL_SECONDS", "1.0"))
+
+# Batch transcription: many files (or archives) in one request
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+# Inference executor configuration: model calls never run on the event loop
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")  # "thread" or "process"
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 1)))
+INFERENCE_TORCH_THREADS = int(os.getenv("INFERENCE_TORCH_THREADS", "0"))
+MODEL_CONCURRENCY = {
+    "ctc": int(os.getenv("MODEL_CONCURRENCY_CTC", "2")),
+    "rnnt": int(os.getenv("MODEL_CONCURRENCY_RNNT", "2")),
+    "ctc_int8": int(os.getenv("MODEL_CONCURRENCY_CTC_INT8", os.getenv("MODEL_CONCURRENCY_CTC", "2"))),
+    "rnnt_int8": int(os.getenv("MODEL_CONCURRENCY_RNNT_INT8", os.getenv("MODEL_CONCURRENCY_RNNT", "2"))),
+    "whisperx": int(os.getenv("MODEL_CONCURRENCY_WHISPERX", "1")),
+}
+
+if INFERENCE_TORCH_THREADS > 0:
+    torch.set_num_threads(INFERENCE_TORCH_THREADS)
+
+inference_executor = InferenceExecutor(
+    kind=INFERENCE_EXECUTOR,
+    max_workers=INFERENCE_WORKERS,
+    model_concurrency=MODEL_CONCURRENCY
+)
+
+# Micro-batching of concurrent short-form GigaAM requests
+BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "true").lower() == "true"
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "20"))
+
+# Called with each long-form utterance as soon as it is decoded
+UtteranceCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Long-form segmentation: "auto" uses pyannote when it is installed and HF_TOKEN is set,
+# otherwise the built-in energy VAD which works offline; "chunks" uses fixed overlapping windows
+LONGFORM_BACKEND = os.getenv("LONGFORM_BACKEND", "auto")  # "auto", "vad", "pyannote" or "chunks"
+LONGFORM_SEGMENT_BATCH_SIZE = int(os.getenv("LONGFORM_SEGMENT_BATCH_SIZE", "4"))
+# Long-form audio is decoded and segmented this many seconds at a time
+LONGFORM_WINDOW_SECONDS = float(os.getenv("LONGFORM_WINDOW_SECONDS", "60"))
+# Segment batches decoded in parallel per long-form request; bounds memory for multi-hour files
+LONGFORM_MAX_PENDING_BATCHES = int(os.getenv("LONGFORM_MAX_PENDING_BATCHES", "8"))
+# Fixed-window long-form mode: windows must fit the short-form model input
+LONGFORM_CHUNK_SECONDS = min(float(os.getenv("LONGFORM_CHUNK_SECONDS", "20")), SHORTFORM_MAX_SECONDS)
+LONGFORM_CHUNK_OVERLAP_SECONDS = float(os.getenv("LONGFORM_CHUNK_OVERLAP_SECONDS", "3"))
+# Bounds how many words at each side of a seam are searched for the shared ones
+LONGFORM_CHUNK_MAX_WORDS_PER_SECOND = 4
+
+# pyannote segmentation: pipelines are loaded once per process and reused by every request
+HF_TOKEN = os.getenv("HF_TOKEN") or None
+# Same segmentation model and chunking as GigaAM's transcribe_longform
+PYANNOTE_SEGMENTATION_MODEL = os.getenv("PYANNOTE_SEGMENTATION_MODEL", "pyannote/segmentation-3.0")
+PYANNOTE_DIARIZATION_MODEL = os.getenv("PYANNOTE_DIARIZATION_MODEL", "pyannote/speaker-diarization-3.1")
+PYANNOTE_DEVICE = os.getenv("PYANNOTE_DEVICE", "cpu")
+PYANNOTE_MAX_CHUNK_SECONDS = min(float(os.getenv("PYANNOTE_MAX_CHUNK_SECONDS", "22")), SHORTFORM_MAX_SECONDS)
+PYANNOTE_MIN_CHUNK_SECONDS = float(os.getenv("PYANNOTE_MIN_CHUNK_SECONDS", "15"))
+# "vad" and/or "diarization": pipelines loaded at startup instead of by the first request
+PYANNOTE_PRELOAD = [p.strip() for p in os.getenv("PYANNOTE_PRELOAD", "").split(",") if p.strip()]
+
+# Libraries that download from the Hugging Face Hub themselves read the token from the environment
+if HF_TOKEN:
+    os.environ.setdefault("HUGGING_FACE_HUB_TOKEN", HF_TOKEN)
+
+vad = EnergyVAD(
+    margin_db=float(os.getenv("VAD_MARGIN_DB", "10")),
+    min_speech_ms=float(os.getenv("VAD_MIN_SPEECH_MS", "250")),
+    min_silence_ms=float(os.getenv("VAD_MIN_SILENCE_MS", "400")),
+    pad_ms=float(os.getenv("VAD_PAD_MS", "200")),
+    max_segment_seconds=float(os.getenv("VAD_MAX_SEGMENT_SECONDS", "20"))
+)
+
+# Silence trimming: non-speech is dropped before inference, timestamps still refer to the original audio
+SILENCE_TRIMMING_ENABLED = os.getenv("SILENCE_TRIMMING_ENABLED", "true").lower() == "true"
+SILENCE_TRIM_MIN_SECONDS = float(os.getenv("SILENCE_TRIM_MIN_SECONDS", "1.0"))
+
+# Real-time transcription over WebSocket
+REALTIME_FINALIZE_SILENCE_MS = float(os.getenv("REALTIME_FINALIZE_SILENCE_MS", "600"))
+REALTIME_MAX_UTTERANCE_SECONDS = min(float(os.getenv("REALTIME_MAX_UTTERANCE_SECONDS", "20")), SHORTFORM_MAX_SECONDS)
+REALTIME_PARTIAL_INTERVAL_MS = float(os.getenv("REALTIME_PARTIAL_INTERVAL_MS", "300"))
+
+# Content-addressed cache of transcription results
+TRANSCRIPTION_CACHE_ENABLED = os.getenv("TRANSCRIPTION_CACHE_ENABLED", "true").lower() == "true"
+TRANSCRIPTION_CACHE_DIR = Path(os.getenv("TRANSCRIPTION_CACHE_DIR", str(UPLOAD_DIR / "cache")))
+TRANSCRIPTION_CACHE_MAX_BYTES = int(float(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+transcription_cache = TranscriptionCache(
+    TRANSCRIPTION_CACHE_DIR,
+    max_bytes=TRANSCRIPTION_CACHE_MAX_BYTES
+) if TRANSCRIPTION_CACHE_ENABLED else None
+
+# Per-segment checkpoints of long-form transcriptions and unfinished jobs, kept across restarts
+CHECKPOINTS_ENABLED = os.getenv("CHECKPOINTS_ENABLED", "true").lower() == "true"
+CHECKPOINT_DB_PATH = Path(os.getenv("CHECKPOINT_DB_PATH", str(UPLOAD_DIR / "checkpoints.db")))
+CHECKPOINT_RETENTION_SECONDS = float(os.getenv("CHECKPOINT_RETENTION_HOURS", "72")) * 3600
+
+checkpoint_store = CheckpointStore(CHECKPOINT_DB_PATH) if CHECKPOINTS_ENABLED else None
+
+# Finished transcriptions, retrievable by id
+TRANSCRIPTION_STORE_ENABLED = os.getenv("TRANSCRIPTION_STORE_ENABLED", "true").lower() == "true"
+TRANSCRIPTION_STORE_PATH = Path(os.getenv("TRANSCRIPTION_STORE_PATH", str(UPLOAD_DIR / "transcriptions.db")))
+
+transcription_store = TranscriptionStore(TRANSCRIPTION_STORE_PATH) if TRANSCRIPTION_STORE_ENABLED else None
+
+# Model management: models are loaded on first use and the least recently used are evicted
+MAX_RESIDENT_MODELS = int(os.getenv("MAX_RESIDENT_MODELS", "2"))
+MODEL_MEMORY_BUDGET_BYTES = int(float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0")) * 1024 * 1024)
+PRELOAD_MODELS = [m.strip() for m in os.getenv("PRELOAD_MODELS", "").split(",") if m.strip()]
+WHISPERX_ENABLED = os.getenv("WHISPERX_ENABLED", "true").lower() == "true"
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "large-v3")
+# Transcription nodes are CPU-only: CTranslate2 int8 is the fast path there
+WHISPERX_DEVICE = os.getenv("WHISPERX_DEVICE", "cpu")
+WHISPERX_COMPUTE_TYPE = os.getenv("WHISPERX_COMPUTE_TYPE", "int8")
+WHISPERX_BATCH_SIZE = int(os.getenv("WHISPERX_BATCH_SIZE", "16"))
+WHISPERX_LANGUAGE = os.getenv("WHISPERX_LANGUAGE") or None
+
+# Based on the GigaAM documentation, v2 models have the lowest WER.
+# Checkpoints are tried in order until one loads.
+GIGAAM_CHECKPOINTS = {
+    "rnnt": ["v2_rnnt", "rnnt", "v1_rnnt"],
+    "ctc": ["v2_ctc", "ctc", "v1_ctc"],
+}
+
+# GigaAM models that are also served with dynamic int8 quantization as "<model>_int8"
+QUANTIZED_MODELS = [m.strip() for m in os.getenv("QUANTIZED_MODELS", "ctc,rnnt").split(",") if m.strip() in GIGAAM_CHECKPOINTS]
+QUANTIZED_SUFFIX = "_int8"
+GIGAAM_MODEL_TYPES = list(GIGAAM_CHECKPOINTS) + [f"{base}{QUANTIZED_SUFFIX}" for base in QUANTIZED_MODELS]
+SUPPORTED_MODEL_TYPES = GIGAAM_MODEL_TYPES + ["whisperx"]
+
+# Admission control: bounded per-model queue in front of /transcribe and /transcribe/batch
+ADMISSION_MAX_ACTIVE = int(os.getenv("ADMISSION_MAX_ACTIVE", "8"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "16"))
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "30"))
+
+admission = AdmissionController(
+    max_active={
+        model_type: int(os.getenv(f"ADMISSION_MAX_ACTIVE_{model_type.upper()}", str(ADMISSION_MAX_ACTIVE)))
+        for model_type in SUPPORTED_MODEL_TYPES
+    },
+    max_queued={
+        model_type: int(os.getenv(f"ADMISSION_QUEUE_SIZE_{model_type.upper()}", str(ADMISSION_QUEUE_SIZE)))
+        for model_type in SUPPORTED_MODEL_TYPES
+    },
+    default_active=ADMISSION_MAX_ACTIVE,
+    default_queued=ADMISSION_QUEUE_SIZE,
+    max_wait_seconds=ADMISSION_MAX_WAIT_SECONDS
+)
+
+# model_type=auto: the accurate model unless it is too busy, then the fast one
+AUTO_ROUTING_ACCURATE_MODEL = os.getenv("AUTO_ROUTING_ACCURATE_MODEL", "rnnt")
+AUTO_ROUTING_FAST_MODEL = os.getenv("AUTO_ROUTING_FAST_MODEL", "ctc")
+AUTO_ROUTING_MAX_QUEUE_DEPTH = int(os.getenv("AUTO_ROUTING_MAX_QUEUE_DEPTH", "2"))
+AUTO_ROUTING_LATENCY_TARGET_SECONDS = float(os.getenv("AUTO_ROUTING_LATENCY_TARGET_SECONDS", "10"))
+
+# Проверка наличия зависимостей для longform транскрипции
 try:
-    logger.info("Initializing models...")
+    import importlib
+    longform_deps = ["pyannote.audio"]
+    missing_deps = []
     
-    # Initialize GigaAM models
-    try:
-        logger.info("Initializing GigaAM models...")
-        
-        # Проверка наличия зависимостей для longform транскрипции
+    for dep in longform_deps:
         try:
-            import importlib
-            longform_deps = ["pyannote.audio"]
-            missing_deps = []
-            
-            for dep in longform_deps:
-                try:
-                    importlib.import_module(dep)
-                except ImportError:
-                    missing_deps.append(dep)
-            
-            if missing_deps:
-                logger.warning(f"Missing longform dependencies: {', '.join(missing_deps)}")
-                logger.warning("Long-form transcription may not work properly")
-            else:
-                logger.info("All longform dependencies are available")
-        except Exception as e:
-            logger.warning(f"Error checking longform dependencies: {str(e)}")
-        
-        # Based on the GigaAM documentation, v2_rnnt is the best model with lowest WER
-        # Available model names: "v2_ctc" or "ctc", "v2_rnnt" or "rnnt", "v1_ctc", "v1_rnnt"
-        
-        # First try to load the best models (v2)
+            importlib.import_module(dep)
+        except ImportError:
+            missing_deps.append(dep)
+    
+    if missing_deps:
+        logger.warning(f"Missing longform dependencies: {', '.join(missing_deps)}")
+        logger.warning("Long-form transcription will use the built-in VAD segmenter")
+    else:
+        logger.info("All longform dependencies are available")
+    PYANNOTE_AVAILABLE = not missing_deps
+except Exception as e:
+    logger.warning(f"Error checking longform dependencies: {str(e)}")
+    PYANNOTE_AVAILABLE = False
+
+pyannote_segmenter = PyannoteSegmenter(
+    PYANNOTE_SEGMENTATION_MODEL,
+    PYANNOTE_DIARIZATION_MODEL,
+    HF_TOKEN,
+    device=PYANNOTE_DEVICE
+)
+if PYANNOTE_AVAILABLE and HF_TOKEN:
+    for pipeline_kind in PYANNOTE_PRELOAD:
         try:
-            logger.info("Attempting to load GigaAM-v2 RNNT model (best performance)")
-            rnnt_model = gigaam.load_model("v2_rnnt")
-            logger.info("Successfully loaded GigaAM-v2 RNNT model")
+            pyannote_segmenter.load(diarization=pipeline_kind == "diarization")
         except Exception as e:
-            logger.warning(f"Failed to load v2_rnnt model: {str(e)}. Falling back to default RNNT model.")
-            try:
-                rnnt_model = gigaam.load_model("rnnt")
-                logger.info("Successfully loaded default RNNT model")
-            except Exception as e2:
-                logger.warning(f"Failed to load default RNNT model: {str(e2)}. Trying v1_rnnt.")
-                try:
-                    rnnt_model = gigaam.load_model("v1_rnnt")
-                    logger.info("Successfully loaded GigaAM-v1 RNNT model")
-                except Exception as e3:
-                    logger.error(f"Failed to load any RNNT model: {str(e3)}")
-                    rnnt_model = None
-        
-        # Load CTC model as fallback
+            logger.error(f"Failed to preload pyannote {pipeline_kind} pipeline: {str(e)}")
+
+def load_gigaam_model(candidates: List[str], quantize: bool = False):
+    """
+    Load the first GigaAM checkpoint from candidates that loads successfully
+
+    Args:
+        candidates: Checkpoint names in order of preference
+        quantize: Convert Linear/LSTM layers to dynamic int8 after loading
+
+    Returns:
+        Tuple of (model, checkpoint name)
+    """
+    last_error = None
+    for name in candidates:
         try:
-            logger.info("Attempting to load GigaAM-v2 CTC model")
-            ctc_model = gigaam.load_model("v2_ctc")
-            logger.info("Successfully loaded GigaAM-v2 CTC model")
+            logger.info(f"Attempting to load GigaAM model {name}")
+            model = gigaam.load_model(name)
+            logger.info(f"Successfully loaded GigaAM model {name}")
         except Exception as e:
-            logger.warning(f"Failed to load v2_ctc model: {str(e)}. Falling back to default CTC model.")
-            try:
-                ctc_model = gigaam.load_model("ctc")
-                logger.info("Successfully loaded default CTC model")
-            except Exception as e2:
-                logger.warning(f"Failed to load default CTC model: {str(e2)}. Trying v1_ctc.")
-                try:
-                    ctc_model = gigaam.load_model("v1_ctc")
-                    logger.info("Successfully loaded GigaAM-v1 CTC model")
-                except Exception as e3:
-                    logger.error(f"Failed to load any CTC model: {str(e3)}")
-                    ctc_model = None
-        
-        # Log which models were successfully loaded
-        if rnnt_model is not None:
-            logger.info("RNNT model is available")
-        if ctc_model is not None:
-            logger.info("CTC model is available")
-        if rnnt_model is None and ctc_model is None:
-            logger.error("Failed to load any GigaAM models")
-        
-    except Exception as e:
-        logger.error(f"Error during GigaAM model initialization: {str(e)}")
-        ctc_model = None
-        rnnt_model = None
+            logger.warning(f"Failed to load {name} model: {str(e)}")
+            last_error = e
+            continue
+        if not quantize:
+            return model, name
+        model = quantize_dynamic_int8(model)
+        # Fail at load time rather than on the first request if a layer does not support int8
+        transcribe_waveform(model, np.zeros(SAMPLE_RATE, dtype=np.float32))
+        return model, f"{name}{QUANTIZED_SUFFIX}"
+    raise RuntimeError(f"Failed to load any of {', '.join(candidates)}: {str(last_error)}")
 
-    # Initialize WhisperX model
-    try:
-        # logger.info("Initializing WhisperX model...")
-        # device = "cuda" if torch.cuda.is_available() else "cpu"
-        # compute_type = "float16" if device == "cuda" else "int8"
-        # whisperx_model = whisperx.load_model("large-v3", device, compute_type=compute_type)
-        # logger.info("Successfully loaded WhisperX model")
-        whisperx_model = None
-    except Exception as e:
-        logger.error(f"Error during WhisperX model initialization: {str(e)}")
-        whisperx_model = None
+def load_whisperx_model():
+    """Load the WhisperX ASR model"""
+    model = whisperx.load_model(
+        WHISPER_MODEL,
+        WHISPERX_DEVICE,
+        compute_type=WHISPERX_COMPUTE_TYPE,
+        language=WHISPERX_LANGUAGE
+    )
+    return model, f"{WHISPER_MODEL}-{WHISPERX_COMPUTE_TYPE}"
 
-except Exception as e:
-    logger.error(f"Error during model initialization: {str(e)}")
-    ctc_model = None
-    rnnt_model = None
-    whisperx_model = None
+def load_whisperx_align_model(language: str):
+    """Load the WhisperX alignment model for a language"""
+    return whisperx.load_align_model(language_code=language, device=WHISPERX_DEVICE)
+
+# Alignment models are loaded once per language and reused across requests
+alignment_models = AlignmentModelCache(load_whisperx_align_model)
+
+model_manager = ModelManager(
+    max_resident=MAX_RESIDENT_MODELS,
+    memory_budget_bytes=MODEL_MEMORY_BUDGET_BYTES
+)
+
+model_router = ModelRouter(
+    admission,
+    is_available=model_manager.is_registered,
+    accurate_model=AUTO_ROUTING_ACCURATE_MODEL,
+    fast_model=AUTO_ROUTING_FAST_MODEL,
+    max_queue_depth=AUTO_ROUTING_MAX_QUEUE_DEPTH,
+    latency_target_seconds=AUTO_ROUTING_LATENCY_TARGET_SECONDS
+)
+for gigaam_type, checkpoints in GIGAAM_CHECKPOINTS.items():
+    model_manager.register(gigaam_type, functools.partial(load_gigaam_model, checkpoints), checkpoints[0])
+for base_type in QUANTIZED_MODELS:
+    checkpoints = GIGAAM_CHECKPOINTS[base_type]
+    model_manager.register(
+        f"{base_type}{QUANTIZED_SUFFIX}",
+        functools.partial(load_gigaam_model, checkpoints, quantize=True),
+        f"{checkpoints[0]}{QUANTIZED_SUFFIX}"
+    )
+if WHISPERX_ENABLED:
+    model_manager.register("whisperx", load_whisperx_model, f"{WHISPER_MODEL}-{WHISPERX_COMPUTE_TYPE}")
+
+# Preloaded models stay resident: under app.serve or INFERENCE_EXECUTOR=process they are shared
+# copy-on-write with the forked workers, and a reload would give every worker a private copy
+for preload_type in PRELOAD_MODELS:
+    try:
+        model_manager.pin(preload_type)
+    except ModelUnavailable as e:
+        logger.error(f"Failed to preload model {preload_type}: {str(e)}")
 
 class TranscriptionRequest(BaseModel):
     model_type: str = "rnnt"  # "ctc", "rnnt", or "whisperx"
@@ -158,35 +389,239 @@ class LongFormTranscriptionResponse(BaseModel):
     transcription: str
 
 
+def transcribe_waveforms_batched(model_type: str, wavs: List[np.ndarray]) -> List[str]:
+    """Transcribe several decoded short-form clips with one forward pass"""
+    model = get_model(model_type)
+    with stage("inference"):
+        return transcribe_batch(model, wavs)
+
+def create_batcher(model_type: str) -> MicroBatcher:
+    async def run_batch(wavs):
+        return await inference_executor.run(model_type, transcribe_waveforms_batched, model_type, wavs)
+    return MicroBatcher(model_type, run_batch, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS)
+
+batchers = {
+    model_type: create_batcher(model_type)
+    for model_type in GIGAAM_MODEL_TYPES
+} if BATCHING_ENABLED else {}
+
+async def transcribe_request(
+    model_type: str,
+    upload: SpooledUpload,
+    use_long_form: bool,
+    on_utterance: Optional[UtteranceCallback] = None,
+    routing: Optional[Dict[str, Any]] = None,
+    transcript_id: Optional[str] = None,
+    speakers: bool = False
+) -> Dict[str, Any]:
+    """
+    Transcribe a spooled upload, serving repeated submissions from the cache
+
+    Short-form GigaAM requests go through the micro-batcher when it is enabled.
+    For long-form requests on_utterance is called with every utterance in order
+    as soon as it is available, and with speakers each GigaAM utterance is
+    labelled with its speaker. routing describes how model_type was chosen for
+    model_type=auto and is returned with the result. The result is saved to the
+    transcription store under transcript_id (or a new id) and returned with it.
+    """
+    # Speaker labels only exist for long-form GigaAM transcriptions
+    speakers = speakers and use_long_form and model_type in GIGAAM_MODEL_TYPES
+    cache_key = None
+    if transcription_cache is not None:
+        cache_key = TranscriptionCache.make_key(
+            upload.sha256,
+            model_type,
+            use_long_form,
+            model_manager.version(model_type),
+            speakers,
+            segmentation_fingerprint(model_type, use_long_form, speakers)
+        )
+        with stage("cache_lookup"):
+            cached = await inference_executor.run_blocking(transcription_cache.get, cache_key)
+        if cached is not None:
+            logger.info(f"Cache hit for {upload.filename} ({model_type}, long_form={use_long_form})")
+            cached["file_info"] = upload.file_info
+            cached["cached"] = True
+            if routing is not None:
+                cached["routing"] = routing
+            if on_utterance is not None:
+                for utterance in cached.get("utterances", []):
+                    await on_utterance(utterance)
+            finish_timings(cached, model_type)
+            await store_result(cached, use_long_form, transcript_id)
+            return cached
+
+    duration = upload.audio_info.duration if upload.audio_info is not None else None
+    batcher = batchers.get(model_type)
+    if use_long_form and model_type in GIGAAM_MODEL_TYPES:
+        result = await transcribe_longform(model_type, upload, on_utterance, speakers)
+    elif batcher is not None and not use_long_form:
+        # With trimming enabled a longer recording may still fit once its pauses are removed
+        if not SILENCE_TRIMMING_ENABLED and duration is not None and duration > SHORTFORM_MAX_SECONDS + 1:
+            raise ValueError("Too long wav file, use long_form mode")
+        wav, _ = await inference_executor.run_blocking(decode_speech, upload.path)
+        if len(wav) > SHORTFORM_MAX_SECONDS * SAMPLE_RATE:
+            raise ValueError("Too long wav file, use long_form mode")
+        with stage("inference"):
+            transcription = await batcher.submit(wav) if len(wav) else ""
+        result = {
+            "transcription": transcription,
+            "model_type": model_type,
+            "file_info": upload.file_info
+        }
+    else:
+        result = await inference_executor.run(
+            model_type, run_transcription, model_type, upload.path, use_long_form, upload.file_info
+        )
+
+    if duration is not None:
+        result["duration"] = round(duration, 3)
+    if cache_key is not None and is_cacheable(result, model_type, use_long_form, speakers):
+        await inference_executor.run_blocking(transcription_cache.put, cache_key, result)
+    if routing is not None:
+        result["routing"] = routing
+    finish_timings(result, model_type)
+    await store_result(result, use_long_form, transcript_id)
+    return result
+
+def is_cacheable(result: Dict[str, Any], model_type: str, use_long_form: bool, speakers: bool) -> bool:
+    """
+    Whether a result may answer later requests with the same cache key
+
+    A long-form result produced by a fallback segmenter (e.g. the built-in VAD
+    after a pyannote failure, without speaker labels) is returned but not
+    cached, so the next request tries the configured segmenter again.
+    """
+    if not use_long_form or model_type not in GIGAAM_MODEL_TYPES:
+        return True
+    segmenter = result.get("segmenter")
+    if segmenter != longform_segmenter(speakers):
+        logger.info(f"Not caching long-form result of fallback segmenter {segmenter}")
+        return False
+    if speakers and not all("speaker" in u for u in result.get("utterances", [])):
+        logger.info("Not caching long-form result without speaker labels")
+        return False
+    return True
+
+def segmentation_fingerprint(model_type: str, use_long_form: bool, speakers: bool) -> str:
+    """
+    Settings that decide how a request's audio is cut before inference
+
+    A cached result is only valid for the settings it was produced with, so
+    they are part of the cache key: long-form GigaAM requests depend on the
+    segmenter and its parameters, all others on silence trimming.
+    """
+    if use_long_form and model_type in GIGAAM_MODEL_TYPES:
+        segmenter = longform_segmenter(speakers)
+        settings: Dict[str, Any] = {"segmenter": segmenter}
+        if segmenter == "pyannote":
+            settings["model"] = PYANNOTE_DIARIZATION_MODEL if speakers else PYANNOTE_SEGMENTATION_MODEL
+            settings["chunk_seconds"] = [PYANNOTE_MIN_CHUNK_SECONDS, PYANNOTE_MAX_CHUNK_SECONDS]
+        elif segmenter == "chunks":
+            settings["chunk_seconds"] = LONGFORM_CHUNK_SECONDS
+            settings["overlap_seconds"] = min(LONGFORM_CHUNK_OVERLAP_SECONDS, LONGFORM_CHUNK_SECONDS / 2)
+            settings["max_words_per_second"] = LONGFORM_CHUNK_MAX_WORDS_PER_SECOND
+        else:
+            settings["vad"] = vad.settings()
+            settings["window_seconds"] = LONGFORM_WINDOW_SECONDS
+    elif SILENCE_TRIMMING_ENABLED:
+        settings = {"trim_min_seconds": SILENCE_TRIM_MIN_SECONDS, "vad": vad.settings()}
+    else:
+        settings = {"trimming": False}
+    return json.dumps(settings, sort_keys=True)
+
+def finish_timings(result: Dict[str, Any], model_type: str) -> None:
+    """Export the stage timings of the current request and add them to the result if requested"""
+    timings = current_timings()
+    if timings is None:
+        return
+    timings.observe(model_type, result.get("duration"))
+    if timings.report:
+        result["timings"] = timings.to_dict(result.get("duration"))
+
+async def store_result(result: Dict[str, Any], use_long_form: bool, transcript_id: Optional[str]) -> None:
+    """Save a result to the transcription store and add its id; failures only cost the id"""
+    if transcription_store is None:
+        return
+    try:
+        result["id"] = await inference_executor.run_blocking(
+            transcription_store.save, result, use_long_form, transcript_id
+        )
+    except Exception as e:
+        logger.error(f"Error storing transcription: {str(e)}")
+
+@app.on_event("startup")
+async def start_workers():
+    inference_executor.start()
+    await job_manager.start()
+    if checkpoint_store is not None:
+        await inference_executor.run_blocking(checkpoint_store.prune, CHECKPOINT_RETENTION_SECONDS)
+        await resume_unfinished_jobs()
+
+@app.on_event("shutdown")
+async def stop_workers():
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await job_manager.stop()
+    for batcher in batchers.values():
+        await batcher.stop()
+    inference_executor.shutdown()
+    if checkpoint_store is not None:
+        checkpoint_store.close()
+    if transcription_store is not None:
+        transcription_store.close()
+
 @app.get("/")
 async def root():
     return {"message": "Audio Transcription Service API"}
 
 @app.get("/health")
 async def health_check():
-    if ctc_model is None and rnnt_model is None:
+    models_info = model_manager.info()
+    if all(models_info[name]["error"] and not models_info[name]["loaded"] for name in GIGAAM_CHECKPOINTS):
         return {
             "status": "unhealthy",
             "message": "GigaAM models failed to load"
         }
-    return {"status": "healthy"}
+    return {"status": "healthy", "inference": inference_executor.stats(), "admission": admission.stats()}
 
 @app.get("/models")
 async def get_available_models():
     models = {
-        "ctc": ctc_model is not None,
-        "rnnt": rnnt_model is not None,
-        "whisperx": whisperx_model is not None
+        model_type: model_manager.is_registered(model_type)
+        for model_type in SUPPORTED_MODEL_TYPES
     }
+    models[AUTO_MODEL_TYPE] = models.get(AUTO_ROUTING_ACCURATE_MODEL, False) or models.get(AUTO_ROUTING_FAST_MODEL, False)
+    # Load state, load time and memory per model
+    models["details"] = model_manager.info()
+    if "whisperx" in models["details"]:
+        models["details"]["whisperx"]["alignment_languages"] = alignment_models.info()
     return models
 
+@app.get("/metrics")
+async def get_metrics():
+    """Batch sizes and other service metrics"""
+    return metrics.snapshot()
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Transcription cache size and hit ratio"""
+    if transcription_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **transcription_cache.stats()}
+
 @app.post("/debug-upload")
 async def debug_upload(file: UploadFile = File(...)):
     """Debug endpoint to test file upload functionality"""
+    upload, error_response = await receive_upload(file)
+    if error_response is not None:
+        return error_response
+    upload.cleanup()
     return {
         "filename": file.filename,
         "content_type": file.content_type,
-        "size": len(await file.read()),
+        "size": upload.size,
+        "sha256": upload.sha256,
+        "audio": upload.audio_info.to_dict(),
         "headers": dict(file.headers)
     }
 
@@ -199,162 +634,488 @@ def cleanup_file(file_path: str):
     except Exception as e:
         logger.error(f"Error cleaning up file {file_path}: {str(e)}")
 
+async def receive_upload(file: UploadFile):
+    """
+    Stream an upload to the spool directory
+
+    Returns:
+        Tuple of (SpooledUpload, None) on success or (None, error response)
+    """
+    try:
+        with stage("spool"):
+            upload = await spool_upload(file, SPOOL_DIR, max_bytes=MAX_UPLOAD_BYTES, chunk_size=UPLOAD_CHUNK_SIZE)
+    except UploadTooLarge as e:
+        return None, JSONResponse(status_code=413, content={"error": str(e)})
+    except EmptyUpload as e:
+        return None, JSONResponse(status_code=400, content={"error": str(e)})
+    
+    # Header parsing is in-process for common formats, so this costs well under a millisecond
+    with stage("probe"):
+        upload.audio_info = await asyncio.to_thread(probe_audio, upload.path)
+    if upload.audio_info is None:
+        upload.cleanup()
+        return None, JSONResponse(status_code=400, content={"error": "File does not contain a supported audio stream"})
+    return upload, None
+
+def get_model(model_type: str):
+    """Return the model for model_type, loading it on first use"""
+    with stage("model_load"):
+        return model_manager.get(model_type)
+
+def validate_model_type(model_type: str) -> Optional[JSONResponse]:
+    """Return an error response if model_type is unknown or its model is not loaded"""
+    if model_type not in SUPPORTED_MODEL_TYPES:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Invalid model_type: {model_type}. Must be one of: {', '.join(SUPPORTED_MODEL_TYPES)}"}
+        )
+    if not model_manager.is_registered(model_type):
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Model {model_type} is not available"}
+        )
+    return None
+
+def select_model(model_type: str, audio_seconds: Optional[float] = None):
+    """
+    Resolve model_type=auto to a concrete model and validate the result
+
+    Args:
+        model_type: Requested model type
+        audio_seconds: Length of the audio, if already known, for the latency prediction
+
+    Returns:
+        Tuple of (model type, routing details or None, error response or None)
+    """
+    routing = None
+    if model_type == AUTO_MODEL_TYPE:
+        model_type, routing = model_router.route(audio_seconds)
+    return model_type, routing, validate_model_type(model_type)
+
+def decode_speech(audio_path: str):
+    """
+    Decode a file and drop its non-speech regions if silence trimming is enabled
+
+    Returns:
+        Tuple of (waveform, TimestampMap from waveform time to original time)
+    """
+    with stage("decode"):
+        wav = decode_audio(audio_path)
+    if not SILENCE_TRIMMING_ENABLED:
+        return wav, TimestampMap.identity(len(wav))
+    with stage("silence_trimming"):
+        return trim_silence(wav, vad, min_removed_seconds=SILENCE_TRIM_MIN_SECONDS)
+
+def map_whisperx_timestamps(segments: List[Dict[str, Any]], timestamps: TimestampMap) -> None:
+    """Shift aligned WhisperX segments and words from trimmed to original time"""
+    for segment in segments:
+        segment["start"], segment["end"] = timestamps.map_boundaries(segment["start"], segment["end"])
+        for word in segment.get("words", []):
+            if "start" in word and "end" in word:
+                word["start"], word["end"] = timestamps.map_boundaries(word["start"], word["end"])
+
+def run_transcription(model_type: str, audio_path: str, use_long_form: bool, file_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Transcribe a saved audio file with the requested model
+
+    The file is decoded once in memory and the waveform is fed to the model
+    directly; only pyannote long-form segmentation still reads the file.
+
+    Args:
+        model_type: "ctc", "rnnt", their "_int8" variants or "whisperx"
+        audio_path: Path to the saved upload
+        use_long_form: Whether to return per-utterance results (WhisperX only)
+        file_info: Filename, size and content type of the upload
+
+    Returns:
+        Response payload with the transcription
+    """
+    model = get_model(model_type)
+
+    if model_type == "whisperx":
+        # Decode audio without its long pauses
+        audio, timestamps = decode_speech(audio_path)
+        if len(audio) == 0:
+            result = {"segments": []}
+        else:
+            # Transcribe with WhisperX
+            with stage("inference"):
+                result = model.transcribe(audio, batch_size=WHISPERX_BATCH_SIZE)
+            
+            # Align whisper output with the cached alignment model for the detected language
+            with stage("alignment"):
+                model_a, metadata = alignment_models.get(result["language"])
+                result = whisperx.align(result["segments"], model_a, metadata, audio, WHISPERX_DEVICE)
+            map_whisperx_timestamps(result["segments"], timestamps)
+        
+        # Format response
+        transcription = " ".join([seg["text"] for seg in result["segments"]])
+        
+        if use_long_form:
+            return {
+                "utterances": [
+                    {
+                        "transcription": seg["text"],
+                        "boundaries": [seg["start"], seg["end"]]
+                    }
+                    for seg in result["segments"]
+                ],
+                "transcription": transcription,
+                "model_type": model_type,
+                "file_info": file_info
+            }
+        return {
+            "transcription": transcription,
+            "model_type": model_type,
+            "file_info": file_info
+        }
+
+    # Process with GigaAM models (long-form requests are handled by transcribe_longform)
+    wav, _ = decode_speech(audio_path)
+    with stage("inference"):
+        transcription = transcribe_waveform(model, wav) if len(wav) else ""
+    return {
+        "transcription": transcription,
+        "model_type": model_type,
+        "file_info": file_info
+    }
+
+def segment_with_pyannote(audio_path: str, speakers: bool) -> Tuple[List[Window], Dict[Tuple[int, int], Optional[str]]]:
+    """
+    Split a recording into chunks with the shared pyannote pipeline
+
+    Args:
+        audio_path: Path to the saved upload
+        speakers: Whether to run speaker diarization instead of voice activity detection
+
+    Returns:
+        Tuple of (chunks to transcribe, speaker label of each chunk by sample range)
+    """
+    with stage("decode"):
+        wav = decode_audio(audio_path)
+    with stage("pyannote"):
+        regions = pyannote_segmenter.regions(wav, diarization=speakers)
+    chunks = group_regions(
+        regions,
+        int(PYANNOTE_MAX_CHUNK_SECONDS * SAMPLE_RATE),
+        int(PYANNOTE_MIN_CHUNK_SECONDS * SAMPLE_RATE)
+    )
+    logger.info(f"pyannote found {len(regions)} speech regions in {len(wav) / SAMPLE_RATE:.1f}s of audio")
+    return (
+        [(start, end, wav[start:end]) for start, end, _ in chunks],
+        {(start, end): speaker for start, end, speaker in chunks}
+    )
+
+async def iter_segment_transcriptions(
+    model_type: str,
+    segments: Iterator[Window],
+    checkpoint_key: Optional[str] = None
+) -> AsyncIterator[Tuple[int, int, str]]:
+    """
+    Transcribe long-form segments as they are read from a recording
+
+    Segments are grouped into small batches as they are produced. Up to
+    LONGFORM_MAX_PENDING_BATCHES batches are decoded in parallel on the
+    inference executor, so peak memory depends on the window and batch sizes
+    rather than on the length of the recording. Results are yielded in time
+    order as soon as their batch (and every earlier one) has been decoded.
+
+    With a checkpoint_key every decoded batch is saved to the checkpoint store,
+    and segments saved by an earlier, interrupted run are not decoded again.
+
+    Yields:
+        (start_sample, end_sample, transcription) of every segment, including empty ones
+    """
+    done: Dict[Tuple[int, int], str] = {}
+    if checkpoint_key is not None:
+        done = await inference_executor.run_blocking(checkpoint_store.load_segments, checkpoint_key)
+        if done:
+            logger.info(f"Resuming long-form transcription with {len(done)} checkpointed segments")
+    
+    async def transcribe_group(group: List[Window]) -> List[str]:
+        missing = [(start, end, wav) for start, end, wav in group if (start, end) not in done]
+        if missing:
+            transcriptions = await inference_executor.run(
+                model_type, transcribe_waveforms_batched, model_type, [wav for _, _, wav in missing]
+            )
+            results = [(start, end, transcription) for (start, end, _), transcription in zip(missing, transcriptions)]
+            if checkpoint_key is not None:
+                with stage("checkpoint"):
+                    await inference_executor.run_blocking(checkpoint_store.save_segments, checkpoint_key, results)
+            done.update(((start, end), transcription) for start, end, transcription in results)
+        return [done[(start, end)] for start, end, _ in group]
+    
+    pending: Deque[Tuple[List[Window], asyncio.Future]] = deque()
+    
+    def submit(group: List[Window]) -> None:
+        pending.append((group, asyncio.ensure_future(transcribe_group(group))))
+    
+    group: List[Window] = []
+    exhausted = False
+    try:
+        while not exhausted or pending:
+            while not exhausted and len(pending) < LONGFORM_MAX_PENDING_BATCHES and not (pending and pending[0][1].done()):
+                # Includes decoding the next window of the file when the current one is used up
+                with stage("segmentation"):
+                    segment = await inference_executor.run_blocking(next, segments, None)
+                if segment is None:
+                    exhausted = True
+                    if group:
+                        submit(group)
+                    continue
+                group.append(segment)
+                if len(group) == LONGFORM_SEGMENT_BATCH_SIZE:
+                    submit(group)
+                    group = []
+            if not pending:
+                continue
+            done_group, task = pending.popleft()
+            transcriptions = await task
+            for (start, end, _), transcription in zip(done_group, transcriptions):
+                yield start, end, transcription
+    finally:
+        for _, task in pending:
+            task.cancel()
+        try:
+            # Stops the ffmpeg reader if the request ends early
+            if hasattr(segments, "close"):
+                segments.close()
+        except ValueError:
+            # Still running in a worker thread; it is closed when garbage collected
+            pass
+
+async def iter_vad_utterances(
+    model_type: str,
+    audio_path: str,
+    checkpoint_key: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Long-form transcription with the built-in VAD
+
+    The file is decoded and segmented one window at a time, and every speech
+    segment becomes one utterance.
+    """
+    segments = iter_speech_segments(audio_path, vad, LONGFORM_WINDOW_SECONDS)
+    async for start, end, transcription in iter_segment_transcriptions(model_type, segments, checkpoint_key):
+        if transcription.strip():
+            yield {
+                "transcription": transcription,
+                "boundaries": [round(start / SAMPLE_RATE, 3), round(end / SAMPLE_RATE, 3)]
+            }
+
+async def iter_pyannote_utterances(
+    model_type: str,
+    windows: List[Window],
+    speakers: Dict[Tuple[int, int], Optional[str]],
+    checkpoint_key: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Long-form transcription of chunks found by pyannote, labelled with their speaker if diarized"""
+    async for start, end, transcription in iter_segment_transcriptions(model_type, iter(windows), checkpoint_key):
+        if transcription.strip():
+            utterance = {
+                "transcription": transcription,
+                "boundaries": [round(start / SAMPLE_RATE, 3), round(end / SAMPLE_RATE, 3)]
+            }
+            if speakers.get((start, end)) is not None:
+                utterance["speaker"] = speakers[(start, end)]
+            yield utterance
+
+async def iter_chunk_utterances(
+    model_type: str,
+    audio_path: str,
+    checkpoint_key: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Long-form transcription with fixed, overlapping windows
+
+    Every LONGFORM_CHUNK_SECONDS window starts LONGFORM_CHUNK_OVERLAP_SECONDS
+    before the previous one ends, so a word cut at one window's edge is heard
+    whole by its neighbour. The windows are transcribed in parallel like VAD
+    segments, and each seam is reconciled on the text: words transcribed by
+    both windows are kept once. Each window becomes one utterance whose
+    boundaries are the midpoints of its overlaps. An utterance is yielded
+    once the seam after it has been reconciled.
+    """
+    overlap = min(LONGFORM_CHUNK_OVERLAP_SECONDS, LONGFORM_CHUNK_SECONDS / 2)
+    max_overlap_words = max(4, int(overlap * LONGFORM_CHUNK_MAX_WORDS_PER_SECOND))
+    segments = iter_fixed_windows(audio_path, LONGFORM_CHUNK_SECONDS, overlap)
+    
+    def utterance(words: List[str], start: int, end: int) -> Dict[str, Any]:
+        return {
+            "transcription": " ".join(words),
+            "boundaries": [round(start / SAMPLE_RATE, 3), round(end / SAMPLE_RATE, 3)]
+        }
+    
+    # Words and start of the window whose end is not reconciled yet, and the end of its audio
+    previous: Optional[Tuple[List[str], int, int]] = None
+    async for start, end, transcription in iter_segment_transcriptions(model_type, segments, checkpoint_key):
+        words = transcription.split()
+        if previous is not None:
+            previous_words, previous_start, previous_end = previous
+            previous_words, words = reconcile_seam(previous_words, words, max_overlap_words)
+            midpoint = (start + previous_end) // 2
+            if previous_words:
+                yield utterance(previous_words, previous_start, midpoint)
+            start = midpoint
+        previous = (words, start, end)
+    if previous is not None and previous[0]:
+        yield utterance(*previous)
+
+def use_pyannote_segmentation(speakers: bool = False) -> bool:
+    if LONGFORM_BACKEND == "pyannote":
+        return True
+    if not (PYANNOTE_AVAILABLE and HF_TOKEN):
+        return False
+    # Speaker labels need the diarization pipeline whatever the configured segmenter
+    return speakers or LONGFORM_BACKEND == "auto"
+
+def longform_segmenter(speakers: bool = False) -> str:
+    """Segmenter long-form GigaAM requests are meant to use; any other one is a fallback"""
+    if use_pyannote_segmentation(speakers):
+        return "pyannote"
+    return "chunks" if LONGFORM_BACKEND == "chunks" else "vad"
+
+async def transcribe_longform(
+    model_type: str,
+    upload: SpooledUpload,
+    on_utterance: Optional[UtteranceCallback] = None,
+    speakers: bool = False
+) -> Dict[str, Any]:
+    """
+    Long-form GigaAM transcription with pyannote, the built-in VAD or overlapping fixed windows
+
+    Args:
+        on_utterance: Optional coroutine called with each utterance as soon as it is decoded
+        speakers: Whether to label utterances with speakers (pyannote only)
+    """
+    checkpoint_key = None
+    if checkpoint_store is not None:
+        checkpoint_key = CheckpointStore.make_key(upload.sha256, model_type, model_manager.version(model_type))
+    
+    iter_utterances = None
+    segmenter = "chunks" if LONGFORM_BACKEND == "chunks" else "vad"
+    if use_pyannote_segmentation(speakers):
+        try:
+            windows, window_speakers = await inference_executor.run(
+                "pyannote", segment_with_pyannote, upload.path, speakers
+            )
+            iter_utterances = iter_pyannote_utterances(model_type, windows, window_speakers, checkpoint_key)
+            segmenter = "pyannote"
+        except Exception as e:
+            logger.error(f"pyannote segmentation error: {str(e)}")
+            logger.info("Falling back to built-in VAD segmentation")
+    elif speakers:
+        logger.warning("Speaker labels need pyannote.audio and HF_TOKEN; transcribing without them")
+    if iter_utterances is None:
+        if segmenter == "chunks":
+            iter_utterances = iter_chunk_utterances(model_type, upload.path, checkpoint_key)
+        else:
+            iter_utterances = iter_vad_utterances(model_type, upload.path, checkpoint_key)
+    
+    utterances = []
+    async for utterance in iter_utterances:
+        utterances.append(utterance)
+        if on_utterance is not None:
+            await on_utterance(utterance)
+    if checkpoint_key is not None:
+        await inference_executor.run_blocking(checkpoint_store.clear_segments, checkpoint_key)
+    
+    return {
+        "utterances": utterances,
+        "transcription": " ".join([u["transcription"] for u in utterances]),
+        "model_type": model_type,
+        "segmenter": segmenter,
+        "file_info": upload.file_info
+    }
+
+async def admit_request(model_type: str):
+    """
+    Wait for an admission slot for model_type
+
+    Returns:
+        Tuple of (AdmissionTicket, None) or (None, 429/503 response with Retry-After)
+    """
+    try:
+        with stage("admission_wait"):
+            return await admission.admit(model_type), None
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected {model_type} request with {e.status_code}: {str(e)}")
+        return None, JSONResponse(
+            status_code=e.status_code,
+            content={"error": str(e), "retry_after": e.retry_after},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+async def admit_accepted(model_type: str) -> AdmissionTicket:
+    """
+    Wait for an admission slot for work that was already accepted
+
+    A queued job or a file of a running batch cannot be turned away, so when
+    admission is rejected it waits for the Retry-After estimate and tries
+    again instead of failing.
+    """
+    with stage("admission_wait"):
+        while True:
+            try:
+                return await admission.admit(model_type)
+            except AdmissionRejected as e:
+                logger.info(f"No {model_type} slot ({str(e)}), retrying in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+
 @app.post("/transcribe")
 async def transcribe_audio(
     file: UploadFile = File(...),
     model_type: str = Form("rnnt"),
-    long_form: str = Form("false")
+    long_form: str = Form("false"),
+    stream: str = Form("false"),
+    timings: str = Form("false"),
+    speakers: str = Form("false")
 ):
-    """Transcribe audio using specified model"""
-    logger.info(f"Received request with model_type={model_type}, long_form={long_form}")
+    """
+    Transcribe audio using specified model
+    
+    With stream=true the response is ndjson: long-form utterances are sent as
+    soon as they are decoded, followed by the complete result. With
+    timings=true the result has a per-stage timings block. With speakers=true
+    long-form utterances are labelled with their speaker.
+    """
+    # Stages are timed for the metrics either way; the streamed transcription inherits the timings
+    StageTimings(report=timings.lower() == "true").activate()
+    logger.info(f"Received request with model_type={model_type}, long_form={long_form}, stream={stream}")
     
     # Convert long_form to boolean
     use_long_form = long_form.lower() == "true"
+    use_speakers = speakers.lower() == "true"
     
-    # Validate model type
-    if model_type not in ["ctc", "rnnt", "whisperx"]:
-        return JSONResponse(
-            status_code=400,
-            content={"error": f"Invalid model_type: {model_type}. Must be 'ctc', 'rnnt', or 'whisperx'"}
-        )
+    model_type, routing, error_response = select_model(model_type)
+    if error_response is not None:
+        return error_response
     
-    # Get model
-    if model_type == "whisperx":
-        model = whisperx_model
-    else:
-        model = ctc_model if model_type == "ctc" else rnnt_model
+    ticket, error_response = await admit_request(model_type)
+    if error_response is not None:
+        return error_response
     
-    if model is None:
-        return JSONResponse(
-            status_code=500,
-            content={"error": f"Model {model_type} is not available"}
-        )
+    # Stream file to disk
+    upload, error_response = await receive_upload(file)
+    if error_response is not None:
+        ticket.release()
+        return error_response
     
-    # Save file
-    temp_dir = None
-    temp_file_path = None
+    if stream.lower() == "true":
+        return StreamingResponse(
+            stream_transcription(model_type, upload, use_long_form, ticket, routing, use_speakers),
+            media_type="application/x-ndjson"
+        )
     
     try:
-        temp_dir = tempfile.mkdtemp()
-        file_extension = os.path.splitext(file.filename)[1] or ".wav"
-        temp_file_path = os.path.join(temp_dir, f"audio{file_extension}")
-        
-        # Read file content and save to disk
-        file_content = await file.read()
-        if not file_content:
-            return JSONResponse(
-                status_code=400,
-                content={"error": "File is empty"}
-            )
-        
-        # Write to disk
-        with open(temp_file_path, "wb") as f:
-            f.write(file_content)
-        
-        logger.info(f"Saved file to {temp_file_path}")
-        
-        # Process based on model type
-        if model_type == "whisperx":
-            # Set Hugging Face token if available
-            hf_token = os.environ.get("HF_TOKEN")
-            if hf_token:
-                os.environ["HUGGING_FACE_HUB_TOKEN"] = hf_token
-                logger.info("Using HF_TOKEN for WhisperX transcription")
-            
-            # Load audio
-            audio = whisperx.load_audio(temp_file_path)
-            
-            # Transcribe with WhisperX
-            result = model.transcribe(audio, batch_size=16)
-            
-            # Align whisper output
-            model_a, metadata = whisperx.load_align_model(language_code=result["language"], device=device)
-            result = whisperx.align(result["segments"], model_a, metadata, audio, device)
-            
-            # Format response
-            transcription = " ".join([seg["text"] for seg in result["segments"]])
-            
-            if use_long_form:
-                return {
-                    "utterances": [
-                        {
-                            "transcription": seg["text"],
-                            "boundaries": [seg["start"], seg["end"]]
-                        }
-                        for seg in result["segments"]
-                    ],
-                    "transcription": transcription,
-                    "model_type": model_type,
-                    "file_info": {
-                        "filename": file.filename,
-                        "size": len(file_content),
-                        "content_type": file.content_type
-                    }
-                }
-            else:
-                return {
-                    "transcription": transcription,
-                    "model_type": model_type,
-                    "file_info": {
-                        "filename": file.filename,
-                        "size": len(file_content),
-                        "content_type": file.content_type
-                    }
-                }
-        else:
-            # Process with GigaAM models
-            if not use_long_form:
-                transcription = model.transcribe(temp_file_path)
-                return {
-                    "transcription": transcription,
-                    "model_type": model_type,
-                    "file_info": {
-                        "filename": file.filename,
-                        "size": len(file_content),
-                        "content_type": file.content_type
-                    }
-                }
-            else:
-                # Try long-form transcription
-                try:
-                    # Set Hugging Face token if available
-                    hf_token = os.environ.get("HF_TOKEN")
-                    if hf_token:
-                        os.environ["HUGGING_FACE_HUB_TOKEN"] = hf_token
-                        logger.info("Using HF_TOKEN for longform transcription")
-                    
-                    utterances = model.transcribe_longform(temp_file_path)
-                    transcription = " ".join([u["transcription"] for u in utterances])
-                    return {
-                        "utterances": [
-                            {
-                                "transcription": u["transcription"],
-                                "boundaries": u["boundaries"]
-                            }
-                            for u in utterances
-                        ],
-                        "transcription": transcription,
-                        "model_type": model_type,
-                        "file_info": {
-                            "filename": file.filename,
-                            "size": len(file_content),
-                            "content_type": file.content_type
-                        }
-                    }
-                except Exception as e:
-                    logger.error(f"Long-form transcription error: {str(e)}")
-                    logger.info("Falling back to regular transcription")
-                    transcription = model.transcribe(temp_file_path)
-                    return {
-                        "transcription": transcription,
-                        "model_type": model_type,
-                        "file_info": {
-                            "filename": file.filename,
-                            "size": len(file_content),
-                            "content_type": file.content_type
-                        }
-                    }
+        return await transcribe_request(model_type, upload, use_long_form, routing=routing, speakers=use_speakers)
             
+    except ModelUnavailable as e:
+        logger.error(str(e))
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
     except Exception as e:
         logger.error(f"Error processing file: {str(e)}")
         return JSONResponse(
@@ -362,15 +1123,637 @@ async def transcribe_audio(
             content={"error": f"File processing error: {str(e)}"}
         )
     finally:
-        # Cleanup
+        upload.cleanup()
+        ticket.release(upload.duration)
+
+async def stream_transcription(
+    model_type: str,
+    upload: SpooledUpload,
+    use_long_form: bool,
+    ticket: Optional[AdmissionTicket] = None,
+    routing: Optional[Dict[str, Any]] = None,
+    speakers: bool = False
+) -> AsyncIterator[str]:
+    """Run a transcription and yield ndjson status, utterance and result lines"""
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def on_utterance(utterance):
+        await events.put(("utterance", utterance))
+    
+    async def run():
         try:
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
-            if temp_dir and os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
+            result = await transcribe_request(model_type, upload, use_long_form, on_utterance, routing, speakers=speakers)
+            await events.put(("completed", result))
         except Exception as e:
-            logger.error(f"Error cleaning up temporary files: {str(e)}")
-            pass
+            logger.error(f"Error processing file: {str(e)}")
+            await events.put(("error", e))
+        finally:
+            upload.cleanup()
+            if ticket is not None:
+                ticket.release(upload.duration)
+    
+    # The transcription keeps running (and fills the cache) even if the client disconnects
+    task = asyncio.ensure_future(run())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    yield json.dumps({"status": "started", "message": "Transcription started"}) + "\n"
+    
+    index = 0
+    while True:
+        kind, payload = await events.get()
+        if kind == "utterance":
+            yield json.dumps({"status": "utterance", "index": index, **payload}, ensure_ascii=False) + "\n"
+            index += 1
+        elif kind == "completed":
+            yield json.dumps({"status": "completed", **payload}, ensure_ascii=False) + "\n"
+            return
+        else:
+            yield json.dumps({"status": "error", "message": f"File processing error: {str(payload)}"}, ensure_ascii=False) + "\n"
+            return
+
+def enqueue_job(
+    model_type: str,
+    upload: SpooledUpload,
+    use_long_form: bool,
+    job_id: Optional[str] = None,
+    report_timings: bool = False,
+    speakers: bool = False
+):
+    """
+    Queue a transcription job and record it in the checkpoint store
+
+    Raises:
+        JobQueueFull: If the queue is at capacity
+    """
+    async def runner(job):
+        async def on_utterance(utterance):
+            await job.publish("utterance", **utterance)
+        if checkpoint_store is not None:
+            await inference_executor.run_blocking(checkpoint_store.set_job_status, job.id, JOB_PROCESSING)
+        selected, routing, error_response = select_model(model_type, upload.duration)
+        if error_response is not None:
+            raise ModelUnavailable(f"Model {selected} is not available")
+        token = StageTimings(report=report_timings).activate()
+        try:
+            ticket = await admit_accepted(selected)
+            try:
+                return await transcribe_request(
+                    selected, upload, use_long_form, on_utterance, routing, transcript_id=job.id, speakers=speakers
+                )
+            finally:
+                ticket.release(upload.duration)
+        finally:
+            StageTimings.deactivate(token)
+    
+    def cleanup():
+        upload.cleanup()
+        if checkpoint_store is None:
+            return
+        if job.status == JOB_FAILED:
+            # Kept so that every worker process can report the failure
+            checkpoint_store.set_job_status(job.id, JOB_FAILED, job.error)
+        else:
+            checkpoint_store.finish_job(job.id)
+    
+    job = job_manager.submit(
+        runner,
+        params={
+            "model_type": model_type,
+            "long_form": use_long_form,
+            "timings": report_timings,
+            "speakers": speakers,
+            "file_info": upload.file_info
+        },
+        cleanup=cleanup,
+        job_id=job_id
+    )
+    if checkpoint_store is not None:
+        checkpoint_store.save_job(job.id, job.params, {
+            "path": upload.path,
+            "size": upload.size,
+            "sha256": upload.sha256,
+            "filename": upload.filename,
+            "content_type": upload.content_type
+        }, owner=process_owner())
+    return job
+
+def process_owner() -> str:
+    """Owner recorded for the jobs queued in this process"""
+    return f"{SERVER_INSTANCE_ID}:{os.getpid()}"
+
+def owner_is_alive(owner: str) -> bool:
+    """Whether the process that queued a job is still serving, e.g. another worker of this server"""
+    instance_id, _, pid = owner.partition(":")
+    if instance_id != SERVER_INSTANCE_ID or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+async def resume_unfinished_jobs() -> None:
+    """Re-enqueue jobs that were queued or running in a server process that has stopped"""
+    for record in await inference_executor.run_blocking(checkpoint_store.unfinished_jobs):
+        job_id, params, saved = record["job_id"], record["params"], record["upload"]
+        if owner_is_alive(record["owner"]):
+            continue
+        if job_manager.queue_full:
+            logger.warning(f"Job queue is full; job {job_id} and later ones stay on disk until the next restart")
+            break
+        # Several worker processes start at once: only the one that claims the job resumes it
+        claimed = await inference_executor.run_blocking(
+            checkpoint_store.claim_job, job_id, record["owner"], process_owner()
+        )
+        if not claimed:
+            continue
+        if not os.path.exists(saved["path"]):
+            logger.warning(f"Dropping unfinished job {job_id}: its upload is gone")
+            await inference_executor.run_blocking(checkpoint_store.finish_job, job_id)
+            continue
+        upload = SpooledUpload(saved["path"], saved["size"], saved["sha256"], saved["filename"], saved["content_type"])
+        upload.audio_info = await inference_executor.run_blocking(probe_audio, upload.path)
+        try:
+            enqueue_job(
+                params["model_type"], upload, params["long_form"],
+                job_id=job_id, report_timings=params.get("timings", False), speakers=params.get("speakers", False)
+            )
+        except JobQueueFull:
+            # Hand the job back to its stopped owner, so the next server start resumes it
+            await inference_executor.run_blocking(
+                checkpoint_store.claim_job, job_id, process_owner(), record["owner"]
+            )
+            logger.warning(f"Job queue is full; job {job_id} and later ones stay on disk until the next restart")
+            break
+        logger.info(f"Resumed unfinished transcription job {job_id}")
+
+@app.post("/transcribe/jobs", status_code=202)
+async def submit_transcription_job(
+    file: UploadFile = File(...),
+    model_type: str = Form("rnnt"),
+    long_form: str = Form("false"),
+    timings: str = Form("false"),
+    speakers: str = Form("false")
+):
+    """Queue audio for transcription and return a job id immediately"""
+    logger.info(f"Received job with model_type={model_type}, long_form={long_form}")
+    use_long_form = long_form.lower() == "true"
+    
+    # model_type=auto is resolved when the job starts, under the load at that time
+    if model_type != AUTO_MODEL_TYPE:
+        error_response = validate_model_type(model_type)
+        if error_response is not None:
+            return error_response
+    
+    upload, error_response = await receive_upload(file)
+    if error_response is not None:
+        return error_response
+    
+    try:
+        job = enqueue_job(
+            model_type, upload, use_long_form,
+            report_timings=timings.lower() == "true", speakers=speakers.lower() == "true"
+        )
+    except JobQueueFull as e:
+        upload.cleanup()
+        return JSONResponse(status_code=503, content={"error": str(e)})
+    
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "queue_position": job_manager.queue_depth
+    }
+
+async def find_shared_job(job_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Look up a job that is not in this process's queue
+
+    A job lives in the memory of the worker process that accepted it (or of
+    none, once it is pruned); the others see its state in the checkpoint store
+    and its result in the transcription store.
+
+    Returns:
+        Tuple of (job status or None if unknown, result or None if not finished)
+    """
+    if transcription_store is not None:
+        stored = await inference_executor.run_blocking(transcription_store.get, job_id)
+        if stored is not None:
+            return {"job_id": job_id, "status": JOB_COMPLETED, "finished_at": stored.get("created_at")}, stored
+    if checkpoint_store is not None:
+        return await inference_executor.run_blocking(checkpoint_store.get_job, job_id), None
+    return None, None
+
+@app.get("/transcribe/jobs/{job_id}")
+async def get_transcription_job(job_id: str):
+    """Get the status of a transcription job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        status, _ = await find_shared_job(job_id)
+        if status is None:
+            return JSONResponse(status_code=404, content={"error": f"Job {job_id} not found"})
+        return status
+    return job.to_dict()
+
+@app.get("/transcribe/jobs/{job_id}/result")
+async def get_transcription_job_result(job_id: str):
+    """Get the result of a finished transcription job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        # Results outlive the job queue: a finished job's transcript is stored under the job id
+        status, result = await find_shared_job(job_id)
+        if status is None:
+            return JSONResponse(status_code=404, content={"error": f"Job {job_id} not found"})
+        if status["status"] == JOB_FAILED:
+            return JSONResponse(status_code=500, content={"error": status.get("error"), "job_id": job_id})
+        if result is None:
+            return JSONResponse(status_code=202, content=status)
+        return result
+    if job.status == JOB_FAILED:
+        return JSONResponse(status_code=500, content={"error": job.error, "job_id": job.id})
+    if job.status != JOB_COMPLETED:
+        return JSONResponse(status_code=202, content=job.to_dict())
+    return job.result
+
+async def poll_shared_job(
+    job_id: str,
+    status: Optional[Dict[str, Any]],
+    result: Optional[Dict[str, Any]]
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the status changes of a job queued by another worker process until it finishes"""
+    last_status = None
+    while True:
+        if status is None:
+            yield {"status": JOB_FAILED, "job_id": job_id, "message": f"Job {job_id} not found"}
+            return
+        if status["status"] == JOB_COMPLETED:
+            yield {"status": JOB_COMPLETED, "job_id": job_id, "result": result}
+            return
+        if status["status"] == JOB_FAILED:
+            yield {"status": JOB_FAILED, "job_id": job_id, "message": f"Transcription error: {status.get('error')}"}
+            return
+        if status["status"] != last_status:
+            last_status = status["status"]
+            yield {"status": last_status, "job_id": job_id}
+        await asyncio.sleep(SHARED_JOB_POLL_SECONDS)
+        status, result = await find_shared_job(job_id)
+
+@app.get("/transcribe/jobs/{job_id}/stream")
+async def stream_transcription_job(job_id: str):
+    """Stream job progress as ndjson until the job finishes"""
+    job = job_manager.get(job_id)
+    if job is None:
+        # Queued by another worker process: only status changes are visible from here
+        status, result = await find_shared_job(job_id)
+        if status is None:
+            return JSONResponse(status_code=404, content={"error": f"Job {job_id} not found"})
+        events = poll_shared_job(job_id, status, result)
+    else:
+        events = job_manager.stream(job)
+    
+    async def generate_events():
+        async for event in events:
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(
+        generate_events(),
+        media_type="application/x-ndjson"
+    )
+
+@app.get("/transcriptions")
+async def list_transcriptions(limit: int = 20, offset: int = 0, model_type: Optional[str] = None):
+    """List stored transcriptions, newest first, without their utterances"""
+    if transcription_store is None:
+        return JSONResponse(status_code=404, content={"error": "Transcription store is disabled"})
+    if not 1 <= limit <= 100 or offset < 0:
+        return JSONResponse(status_code=400, content={"error": "limit must be between 1 and 100 and offset must not be negative"})
+    return await inference_executor.run_blocking(transcription_store.list, limit, offset, model_type)
+
+@app.get("/transcriptions/{transcript_id}")
+async def get_transcription(transcript_id: str):
+    """Get a stored transcription with its utterances by id"""
+    if transcription_store is None:
+        return JSONResponse(status_code=404, content={"error": "Transcription store is disabled"})
+    result = await inference_executor.run_blocking(transcription_store.get, transcript_id)
+    if result is None:
+        return JSONResponse(status_code=404, content={"error": f"Transcription {transcript_id} not found"})
+    return result
+
+# (filename, spooled upload or None, error message or None) of one file in a batch
+BatchEntry = Tuple[Optional[str], Optional[SpooledUpload], Optional[str]]
+
+async def receive_batch_uploads(files: List[UploadFile]):
+    """
+    Spool every file of a batch request, unpacking zip and tar archives
+
+    Files that are empty or not audio are kept as entries with an error so
+    they are reported in the results instead of failing the whole batch.
+
+    Returns:
+        Tuple of (list of BatchEntry, None) on success or (None, error response)
+    """
+    entries: List[BatchEntry] = []
+    
+    def cleanup_entries():
+        for _, upload, _ in entries:
+            if upload is not None:
+                upload.cleanup()
+    
+    try:
+        for file in files:
+            try:
+                upload = await spool_upload(file, SPOOL_DIR, max_bytes=MAX_UPLOAD_BYTES, chunk_size=UPLOAD_CHUNK_SIZE)
+            except EmptyUpload as e:
+                entries.append((file.filename, None, str(e)))
+                continue
+            if is_archive(upload.filename):
+                try:
+                    members = await asyncio.to_thread(
+                        extract_archive, upload, SPOOL_DIR,
+                        max_files=max(0, BATCH_MAX_FILES - len(entries)),
+                        max_bytes=MAX_UPLOAD_BYTES,
+                        chunk_size=UPLOAD_CHUNK_SIZE
+                    )
+                finally:
+                    upload.cleanup()
+                entries.extend((member.filename, member, None) for member in members)
+            else:
+                entries.append((upload.filename, upload, None))
+            if len(entries) > BATCH_MAX_FILES:
+                raise InvalidArchive(f"Too many files. Maximum is {BATCH_MAX_FILES} per batch")
+    except UploadTooLarge as e:
+        cleanup_entries()
+        return None, JSONResponse(status_code=413, content={"error": str(e)})
+    except InvalidArchive as e:
+        cleanup_entries()
+        return None, JSONResponse(status_code=400, content={"error": str(e)})
+    
+    for index, (filename, upload, error) in enumerate(entries):
+        if upload is None:
+            continue
+        upload.audio_info = await asyncio.to_thread(probe_audio, upload.path)
+        if upload.audio_info is None:
+            upload.cleanup()
+            entries[index] = (filename, None, "File does not contain a supported audio stream")
+    return entries, None
+
+@app.post("/transcribe/batch")
+async def transcribe_batch_files(
+    files: List[UploadFile] = File(...),
+    model_type: str = Form("rnnt"),
+    long_form: str = Form("false"),
+    timings: str = Form("false"),
+    speakers: str = Form("false")
+):
+    """
+    Transcribe many files in one request
+    
+    Files can be uploaded individually or packed in zip/tar archives. They are
+    transcribed in parallel and the response is ndjson with one line per file
+    in the order the files finish, followed by a summary line.
+    """
+    logger.info(f"Received batch of {len(files)} uploads with model_type={model_type}, long_form={long_form}")
+    use_long_form = long_form.lower() == "true"
+    
+    # model_type=auto picks one model for the whole batch
+    model_type, routing, error_response = select_model(model_type)
+    if error_response is not None:
+        return error_response
+    
+    # Admitting the batch turns it away early under overload; its slot goes to the first file
+    ticket, error_response = await admit_request(model_type)
+    if error_response is not None:
+        return error_response
+    
+    entries, error_response = await receive_batch_uploads(files)
+    if error_response is None and not entries:
+        error_response = JSONResponse(status_code=400, content={"error": "No files to transcribe"})
+    if error_response is not None:
+        ticket.release(record=False)
+        return error_response
+    
+    return StreamingResponse(
+        stream_batch_transcription(
+            model_type, entries, use_long_form, ticket, routing, timings.lower() == "true", speakers.lower() == "true"
+        ),
+        media_type="application/x-ndjson"
+    )
+
+async def stream_batch_transcription(
+    model_type: str,
+    entries: List[BatchEntry],
+    use_long_form: bool,
+    ticket: Optional[AdmissionTicket] = None,
+    routing: Optional[Dict[str, Any]] = None,
+    report_timings: bool = False,
+    speakers: bool = False
+) -> AsyncIterator[str]:
+    """
+    Transcribe batch entries concurrently and yield one ndjson line per file as it completes
+
+    Every running file holds its own admission slot, so concurrent files count
+    against the model's limit. The batch's ticket is used by the first file.
+    """
+    semaphore = asyncio.Semaphore(max(1, BATCH_CONCURRENCY))
+    started = time.perf_counter()
+    spare_tickets = [ticket] if ticket is not None else []
+    
+    async def transcribe_entry(index: int, filename: Optional[str], upload: Optional[SpooledUpload], error: Optional[str]):
+        if error is not None:
+            return index, filename, None, error
+        # Each file runs in its own task, so it gets its own timings
+        StageTimings(report=report_timings).activate()
+        async with semaphore:
+            file_ticket = spare_tickets.pop() if spare_tickets else await admit_accepted(model_type)
+            try:
+                result = await transcribe_request(model_type, upload, use_long_form, routing=routing, speakers=speakers)
+                return index, filename, result, None
+            except Exception as e:
+                logger.error(f"Error processing file {filename}: {str(e)}")
+                return index, filename, None, f"File processing error: {str(e)}"
+            finally:
+                upload.cleanup()
+                # The batch's ticket was also held during the upload of every file
+                file_ticket.release(upload.duration, record=file_ticket is not ticket)
+    
+    tasks = [
+        asyncio.ensure_future(transcribe_entry(index, *entry))
+        for index, entry in enumerate(entries)
+    ]
+    yield json.dumps({"status": "started", "files": len(entries)}) + "\n"
+    
+    succeeded = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, filename, result, error = await next_done
+            if error is None:
+                succeeded += 1
+                line = {"status": "file", "index": index, "filename": filename, "result": result}
+            else:
+                line = {"status": "file_error", "index": index, "filename": filename, "message": error}
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+        yield json.dumps({
+            "status": "completed",
+            "files": len(entries),
+            "succeeded": succeeded,
+            "failed": len(entries) - succeeded,
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        }) + "\n"
+    finally:
+        # The client went away: stop the remaining files and drop their spool files
+        for task in tasks:
+            task.cancel()
+        for _, upload, _ in entries:
+            if upload is not None:
+                upload.cleanup()
+        if ticket is not None:
+            # Unused if no file was transcribed; the batch as a whole is not a service time sample
+            ticket.release(record=False)
+
+async def transcribe_realtime_window(model_type: str, wav: np.ndarray) -> str:
+    """Decode one window of a live stream, sharing batches with other requests when possible"""
+    batcher = batchers.get(model_type)
+    if batcher is not None:
+        return await batcher.submit(wav)
+    return (await inference_executor.run(model_type, transcribe_waveforms_batched, model_type, [wav]))[0]
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, Any]:
+    if not latencies:
+        return {"count": 0}
+    values = np.array(latencies) * 1000
+    return {
+        "count": len(latencies),
+        "mean_ms": round(float(values.mean()), 1),
+        "p50_ms": round(float(np.percentile(values, 50)), 1),
+        "p95_ms": round(float(np.percentile(values, 95)), 1),
+        "max_ms": round(float(values.max()), 1)
+    }
+
+@app.websocket("/ws/transcribe")
+async def realtime_transcription(websocket: WebSocket, model_type: str = "ctc", sample_rate: int = SAMPLE_RATE):
+    """
+    Transcribe a live audio stream
+
+    The client sends binary messages with 16 kHz mono 16-bit little-endian PCM
+    and a text message {"event": "end"} when the recording stops. The server
+    sends "partial" hypotheses of the open utterance and a "final" one when an
+    utterance is closed by a pause. Every hypothesis carries latency_ms, the
+    time from receiving the newest audio chunk to sending the result.
+    """
+    await websocket.accept()
+    error = None
+    if model_type not in GIGAAM_MODEL_TYPES or not model_manager.is_registered(model_type):
+        error = f"Real-time transcription supports {', '.join(GIGAAM_MODEL_TYPES)} models, got '{model_type}'"
+    elif sample_rate != SAMPLE_RATE:
+        error = f"Audio must be {SAMPLE_RATE} Hz mono 16-bit PCM, got sample_rate={sample_rate}"
+    if error is not None:
+        await websocket.send_json({"type": "error", "message": error})
+        await websocket.close(code=1008)
+        return
+
+    session = StreamingSession(
+        vad,
+        finalize_silence_ms=REALTIME_FINALIZE_SILENCE_MS,
+        max_utterance_seconds=REALTIME_MAX_UTTERANCE_SECONDS,
+        partial_interval_ms=REALTIME_PARTIAL_INTERVAL_MS
+    )
+    audio_ready = asyncio.Event()
+    state = {"last_received": time.perf_counter(), "ended": False, "disconnected": False}
+    latencies: List[float] = []
+    histograms = {
+        kind: metrics.histogram("realtime_latency_seconds", model_type=model_type, kind=kind)
+        for kind in ("partial", "final")
+    }
+
+    async def receive_audio():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    state["disconnected"] = True
+                    break
+                if message.get("bytes") is not None:
+                    session.add_pcm(message["bytes"])
+                    state["last_received"] = time.perf_counter()
+                elif message.get("text"):
+                    try:
+                        event = json.loads(message["text"]).get("event")
+                    except (ValueError, AttributeError):
+                        event = None
+                    if event == "end":
+                        break
+                audio_ready.set()
+        finally:
+            state["ended"] = True
+            audio_ready.set()
+
+    async def send_hypothesis(kind: str, window, received_at: float):
+        start, end, wav = window
+        # Every decode takes its own slot, so an idle session does not hold one
+        if kind == "partial":
+            # Partials are best effort and would be stale after waiting: the final covers the same audio
+            ticket = admission.try_admit(model_type)
+            if ticket is None:
+                return
+        else:
+            ticket = await admission.admit(model_type)
+        try:
+            text = await transcribe_realtime_window(model_type, wav)
+        finally:
+            ticket.release(len(wav) / SAMPLE_RATE)
+        latency = time.perf_counter() - received_at
+        histograms[kind].observe(latency)
+        latencies.append(latency)
+        await websocket.send_json({
+            "type": kind,
+            "text": text,
+            "start": round(start / SAMPLE_RATE, 3),
+            "end": round(end / SAMPLE_RATE, 3),
+            "latency_ms": round(latency * 1000, 1)
+        })
+
+    logger.info(f"Real-time transcription session started with model_type={model_type}")
+    receiver = asyncio.create_task(receive_audio())
+    try:
+        while True:
+            await audio_ready.wait()
+            audio_ready.clear()
+            # Everything received so far is decoded together, stale partials are skipped
+            received_at = state["last_received"]
+            if state["ended"]:
+                if state["disconnected"]:
+                    break
+                for window in session.flush():
+                    await send_hypothesis("final", window, received_at)
+                await websocket.send_json({
+                    "type": "end",
+                    "duration": round(session.total_samples / SAMPLE_RATE, 3),
+                    "latency": summarize_latencies(latencies)
+                })
+                await websocket.close()
+                break
+            for window in session.take_final():
+                await send_hypothesis("final", window, received_at)
+            window = session.take_partial()
+            if window is not None:
+                await send_hypothesis("partial", window, received_at)
+    except WebSocketDisconnect:
+        pass
+    except AdmissionRejected as e:
+        logger.warning(f"Ending real-time {model_type} session: {str(e)}")
+        if not state["disconnected"]:
+            await websocket.send_json({"type": "error", "message": str(e), "retry_after": e.retry_after})
+            await websocket.close(code=1013)
+    except Exception as e:
+        logger.error(f"Real-time transcription failed: {str(e)}")
+        if not state["disconnected"]:
+            await websocket.send_json({"type": "error", "message": f"Transcription error: {str(e)}"})
+            await websocket.close(code=1011)
+    finally:
+        receiver.cancel()
+        await asyncio.gather(receiver, return_exceptions=True)
+        logger.info(f"Real-time transcription session finished: {summarize_latencies(latencies)}")
 
 @app.get("/test")
 async def test_endpoint():
@@ -378,8 +1761,8 @@ async def test_endpoint():
     return {
         "status": "ok",
         "models": {
-            "ctc": ctc_model is not None,
-            "rnnt": rnnt_model is not None
+            "ctc": model_manager.is_registered("ctc"),
+            "rnnt": model_manager.is_registered("rnnt")
         },
         "timestamp": datetime.datetime.now().isoformat()
     } 
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Preforking launcher of the transcription service: python -m app.serve
+
+Models are loaded once in this process, then SERVE_WORKERS worker processes
+are forked, each running its own event loop on the shared listening socket.
+Model weights are never written by inference, so their pages stay shared
+copy-on-write: memory grows with per-worker activations and buffers, not
+with the size of the models.
+"""
+import gc
+import logging
+import os
+import signal
+import time
+from typing import Dict
+
+os.environ.setdefault("PRELOAD_MODELS", "ctc,rnnt")
+
+import torch  # noqa: E402
+import uvicorn  # noqa: E402
+
+from app.main import app  # noqa: E402  (loads PRELOAD_MODELS in this process)
+
+logger = logging.getLogger(__name__)
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8004"))
+SERVE_WORKERS = max(1, int(os.getenv("SERVE_WORKERS", "2")))
+# Intra-op threads of each worker; 0 splits the cores evenly between workers
+WORKER_TORCH_THREADS = int(os.getenv("WORKER_TORCH_THREADS", "0"))
+TIMEOUT_KEEP_ALIVE = int(os.getenv("TIMEOUT_KEEP_ALIVE", "600"))
+TIMEOUT_GRACEFUL_SHUTDOWN = int(os.getenv("TIMEOUT_GRACEFUL_SHUTDOWN", "300"))
+# Pause before a crashed worker is replaced, so a worker failing on start does not spin
+RESTART_DELAY_SECONDS = 1.0
+
+
+def worker_torch_threads() -> int:
+    if WORKER_TORCH_THREADS > 0:
+        return WORKER_TORCH_THREADS
+    return max(1, (os.cpu_count() or 1) // SERVE_WORKERS)
+
+
+class Supervisor:
+    """Forks the worker processes and replaces those that exit unexpectedly."""
+
+    def __init__(self, config: uvicorn.Config, worker_count: int):
+        """
+        Args:
+            config: Server configuration shared by all workers
+            worker_count: Number of worker processes
+        """
+        self.config = config
+        self.worker_count = worker_count
+        self.workers: Dict[int, int] = {}
+        self.stopping = False
+        self._socket = None
+
+    def run(self) -> None:
+        self._socket = self.config.bind_socket()
+        # Objects created so far (mostly the loaded models) are never collected: freezing them
+        # keeps the collector from writing to their pages and un-sharing them in every worker
+        gc.collect()
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        logger.info(
+            f"Starting {self.worker_count} workers on {HOST}:{PORT} "
+            f"with {worker_torch_threads()} torch threads each"
+        )
+        for index in range(self.worker_count):
+            self._spawn(index)
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index = self.workers.pop(pid, None)
+            if index is None or self.stopping:
+                continue
+            logger.error(f"Worker {index} (pid {pid}) exited with code {os.waitstatus_to_exitcode(status)}, restarting")
+            time.sleep(RESTART_DELAY_SECONDS)
+            if not self.stopping:
+                self._spawn(index)
+        logger.info("All workers stopped")
+
+    def _spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                self._serve(index)
+            except BaseException:
+                logger.exception(f"Worker {index} failed")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self.workers[pid] = index
+        logger.info(f"Started worker {index} (pid {pid})")
+
+    def _serve(self, index: int) -> None:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        torch.set_num_threads(worker_torch_threads())
+        uvicorn.Server(self.config).run(sockets=[self._socket])
+
+    def _stop(self, signum, frame) -> None:
+        """Shut the workers down gracefully; each finishes its open requests first"""
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                # A terminal's Ctrl+C already reached the workers: a second SIGINT would abort them
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main() -> None:
+    config = uvicorn.Config(
+        app,
+        host=HOST,
+        port=PORT,
+        timeout_keep_alive=TIMEOUT_KEEP_ALIVE,
+        timeout_graceful_shutdown=TIMEOUT_GRACEFUL_SHUTDOWN
+    )
+    Supervisor(config, SERVE_WORKERS).run()
+
+
+if __name__ == "__main__":
+    main()
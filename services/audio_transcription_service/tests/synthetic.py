@@ -0,0 +1,31 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from app.core.audio_utils import SAMPLE_RATE
+
+
+def noisy_recording(
+    total_seconds: float,
+    speech: List[Tuple[float, float]],
+    noise_db: float = -50.0,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Gaussian background noise with speech-like voiced sound in the given spans
+
+    Args:
+        total_seconds: Length of the recording
+        speech: (start, end) seconds of every stretch of speech
+        noise_db: RMS level of the noise in dBFS
+        seed: Seed of the noise generator
+    """
+    rng = np.random.default_rng(seed)
+    wav = rng.normal(0.0, 10 ** (noise_db / 20), int(total_seconds * SAMPLE_RATE)).astype(np.float32)
+    for start, end in speech:
+        t = np.arange(int((end - start) * SAMPLE_RATE)) / SAMPLE_RATE
+        # A 150 Hz voice whose level rises and falls with four syllables a second
+        voice = 0.1 * np.sin(2 * np.pi * 150 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+        offset = int(start * SAMPLE_RATE)
+        wav[offset:offset + len(voice)] += voice.astype(np.float32)
+    return wav
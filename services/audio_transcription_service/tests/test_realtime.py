@@ -0,0 +1,41 @@
+from app.core.audio_utils import SAMPLE_RATE
+from app.core.realtime import StreamingSession
+from app.core.vad import EnergyVAD
+from tests.synthetic import noisy_recording
+
+CHUNK = SAMPLE_RATE // 10
+
+
+def run_session(wav):
+    """Feed a recording in 100 ms chunks; return final (start, end) seconds and the number of partials"""
+    session = StreamingSession(EnergyVAD())
+    finals, partials = [], 0
+    for offset in range(0, len(wav), CHUNK):
+        session.add_samples(wav[offset:offset + CHUNK])
+        finals += [(start / SAMPLE_RATE, end / SAMPLE_RATE) for start, end, _ in session.take_final()]
+        partials += session.take_partial() is not None
+    finals += [(start / SAMPLE_RATE, end / SAMPLE_RATE) for start, end, _ in session.flush()]
+    return finals, partials
+
+
+def test_long_pause_mid_session_is_silence():
+    # Two minutes of background noise between two utterances, e.g. while the doctor reads
+    wav = noisy_recording(150, [(0, 10), (130, 140)])
+
+    finals, partials = run_session(wav)
+
+    assert len(finals) == 2
+    assert finals[0][0] <= 0.1 and finals[0][1] >= 10
+    assert finals[1][0] <= 130.1 and finals[1][1] >= 140
+    # Partials are only decoded while someone speaks, one per partial interval
+    assert partials <= 20 / 0.3 + 10
+
+
+def test_speech_longer_than_max_utterance_is_split():
+    wav = noisy_recording(45, [(1, 44)])
+
+    finals, _ = run_session(wav)
+
+    assert len(finals) >= 3
+    assert all(end - start <= 20.1 for start, end in finals)
+    assert sum(end - start for start, end in finals) > 42
@@ -0,0 +1,35 @@
+import pytest
+
+from app.core.audio_utils import SAMPLE_RATE
+from app.core.trimming import trim_silence
+from app.core.vad import EnergyVAD
+from tests.synthetic import noisy_recording
+
+# Padding the VAD keeps on each side of an utterance
+PAD_SECONDS = 0.2
+
+
+@pytest.mark.parametrize("speech_share", [0.04, 0.08, 0.2, 0.5])
+def test_trimmed_audio_shrinks_with_share_of_silence(speech_share):
+    # Ten utterances spread evenly over ten minutes of -50 dBFS noise
+    total, count = 600, 10
+    length = total * speech_share / count
+    spans = [(i * total / count + 5, i * total / count + 5 + length) for i in range(count)]
+    wav = noisy_recording(total, spans)
+
+    trimmed, timestamps = trim_silence(wav, EnergyVAD())
+
+    kept = len(trimmed) / SAMPLE_RATE
+    assert total * speech_share <= kept <= total * speech_share + count * 2 * PAD_SECONDS + 0.5
+    assert timestamps.removed_seconds == pytest.approx(total - kept, abs=0.01)
+    # The first kept sample is the start of the first utterance's padding in the original
+    assert timestamps.to_original(0) == pytest.approx(spans[0][0] - PAD_SECONDS, abs=0.05)
+
+
+def test_recording_without_pauses_is_not_trimmed():
+    wav = noisy_recording(20, [(0, 20)])
+
+    trimmed, timestamps = trim_silence(wav, EnergyVAD())
+
+    assert len(trimmed) == len(wav)
+    assert timestamps.removed_seconds == 0
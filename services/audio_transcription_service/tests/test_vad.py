@@ -0,0 +1,49 @@
+import numpy as np
+
+from app.core.audio_utils import SAMPLE_RATE
+from app.core.vad import EnergyVAD
+from tests.synthetic import noisy_recording
+
+
+def speech_seconds(regions):
+    return sum(end - start for start, end in regions) / SAMPLE_RATE
+
+
+def test_mostly_silent_recording_over_noise_floor():
+    # 33 s of speech in 600 s of -50 dBFS noise, e.g. long pauses while a doctor types
+    spans = [(50 + i * 60, 53.3 + i * 60) for i in range(10)]
+    wav = noisy_recording(600, spans)
+
+    regions = EnergyVAD().segment(wav)
+
+    assert len(regions) == len(spans)
+    for (start, end), (speech_start, speech_end) in zip(regions, spans):
+        assert start / SAMPLE_RATE <= speech_start + 0.1
+        assert end / SAMPLE_RATE >= speech_end - 0.1
+    # Only the padding around each utterance is kept besides the speech
+    assert speech_seconds(regions) < 33 + len(spans) * 0.5
+
+
+def test_short_speech_in_long_noisy_file_is_not_one_long_segment():
+    wav = noisy_recording(139, [(10, 16), (100, 106)])
+
+    regions = EnergyVAD().segment(wav)
+
+    assert len(regions) == 2
+    assert speech_seconds(regions) < 14
+
+
+def test_steady_noise_has_no_speech():
+    wav = noisy_recording(60, [])
+
+    assert EnergyVAD().segment(wav) == []
+
+
+def test_speech_without_pauses_is_kept():
+    wav = noisy_recording(30, [(0, 30)])
+
+    assert speech_seconds(EnergyVAD().segment(wav)) > 29
+
+
+def test_digital_silence_has_no_speech():
+    assert EnergyVAD().segment(np.zeros(10 * SAMPLE_RATE, dtype=np.float32)) == []
@@ -12,6 +12,7 @@ app = FastAPI(title="Medical Document Analysis Service")
 # Service URLs from environment variables
 RAG_SERVICE_URL = os.getenv("RAG_SERVICE_URL", "http://rag-doc-service:8001")
 LLM_SERVICE_URL = os.getenv("LLM_SERVICE_URL", "http://llm-service:8003")
+AUDIO_TRANSCRIPTION_SERVICE_URL = os.getenv("AUDIO_TRANSCRIPTION_SERVICE_URL", "http://audio-transcription-service:8004")
 
 class MedicalDocRequest(BaseModel):
     medical_doc: str
@@ -25,7 +26,9 @@ class MedicalDocResponse(BaseModel):
     model_info: Dict[str, Any]
 
 class TranscriptRequest(BaseModel):
-    transcript: str
+    transcript: Optional[str] = None
+    # Id of a transcription stored by the audio service, used instead of transcript
+    transcript_id: Optional[str] = None
     model_type: str = "openai"
     parameters: Optional[Dict[str, Any]] = None
 
@@ -105,6 +108,22 @@ async def search_similar_documents(medical_doc: str, top_k: int) -> List[Dict[st
         except httpx.HTTPError as e:
             raise HTTPException(status_code=500, detail=f"Ошибка при поиске похожих документов: {str(e)}")
 
+async def fetch_transcript(transcript_id: str) -> str:
+    """Получение текста транскрипции по идентификатору из сервиса транскрибации"""
+    async with httpx.AsyncClient(timeout=httpx.Timeout(timeout=60.0)) as client:
+        try:
+            response = await client.get(f"{AUDIO_TRANSCRIPTION_SERVICE_URL}/transcriptions/{transcript_id}")
+            if response.status_code == 404:
+                raise HTTPException(status_code=404, detail=f"Транскрипция {transcript_id} не найдена")
+            response.raise_for_status()
+            result = response.json()
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка при получении транскрипции: {str(e)}")
+    # Для длинной транскрипции каждая фраза идет с новой строки
+    if result.get("utterances"):
+        return "\n".join(u["transcription"] for u in result["utterances"])
+    return result.get("transcription", "")
+
 async def generate_llm_recommendations(prompt: str, model_type: str, parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Генерация рекомендаций через LLM сервис"""
     async with httpx.AsyncClient(timeout=httpx.Timeout(timeout=600.0)) as client:  # 5 minutes timeout
@@ -203,6 +222,12 @@ async def analyze_medical_doc(request: MedicalDocRequest):
 
 @app.post("/process_transcript")
 async def process_transcript(request: TranscriptRequest):
+    if request.transcript is None and request.transcript_id is None:
+        raise HTTPException(status_code=400, detail="Укажите transcript или transcript_id")
+    transcript = request.transcript
+    if transcript is None:
+        transcript = await fetch_transcript(request.transcript_id)
+    
     async def generate_documentation():
         try:
             # 1. Send initial status
@@ -211,7 +236,7 @@ async def process_transcript(request: TranscriptRequest):
             
             # 2. Create prompt
             yield json.dumps({"status": "preparing", "message": "Подготовка анализа..."}) + "\n"
-            transcript_prompt = create_transcript_prompt(request.transcript)
+            transcript_prompt = create_transcript_prompt(transcript)
             await asyncio.sleep(0.1)
             
             # 3. Generate structured documentation